@@ -1,53 +1,244 @@
-import json
-from seleniumbase import SB
-from bs4 import BeautifulSoup
+import atexit
+import base64
+import queue
+import threading
+import logging
+import logging.handlers
+import re
+import signal
 import time
 import os
-import uuid
 import sys
+import argparse
 from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from urllib.parse import urljoin
 import traceback
 
-def log(control_number, message, level="INFO"):
-    """Enhanced logging with timestamps and levels"""
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    print(f"[{timestamp}] [{level}] [{control_number}] {message}")
+# orjson, seleniumbase, mycdp, lxml (through georgia_parser) and requests are
+# imported where they are used, so argument errors and parse-only imports
+# don't pay for the browser stack
 
-def create_logs_folder():
-    """Create logs folder if it doesn't exist"""
-    if not os.path.exists("logs"):
-        os.makedirs("logs")
-        print("Created logs folder")
+SEARCH_URL = "https://ecorp.sos.ga.gov/BusinessSearch"
+SEARCH_INPUT = 'input[id="txtControlNo"]'
+
+# Progress screenshots, captcha page dumps and the extra page-source reads are
+# only done when debugging. Screenshots are written to disk only if the scrape
+# fails, or always when debugging.
+DEBUG_ARTIFACTS = os.getenv("DEBUG_ARTIFACTS") == "1"
+
+# A persistent profile keeps Chrome's caches and the cf_clearance cookie warm
+# between runs. Chrome locks a profile, so pool workers each get their own copy.
+CHROME_PROFILE_DIR = os.getenv("CHROME_PROFILE_DIR", ".chrome-profile")
+CHROME_ARGS = "--disable-gpu,--no-sandbox,--disable-dev-shm-usage"
+
+# The GUI captcha methods move the one real mouse, so browsers running side by
+# side would fight over it. A batch uses a single browser unless these clicks
+# are turned off with GUI_CAPTCHA_CLICKS=0 or MAX_WORKERS asks for more.
+GUI_CAPTCHA_CLICKS = os.getenv("GUI_CAPTCHA_CLICKS") != "0"
+DEFAULT_WORKERS = 1 if GUI_CAPTCHA_CLICKS else 4
+
+# The title is read from the raw page, since only the tables are handed to lxml
+TITLE_PATTERN = re.compile(r"<title[^>]*>(.*?)</title>", re.IGNORECASE | re.DOTALL)
+
+# [second, formatted] for the last log line; log() is called many times a second
+_log_clock = [0, ""]
+
+def log_timestamp():
+    """Current local time as "%Y-%m-%d %H:%M:%S", formatted at most once per second"""
+    now = int(time.time())
+    if now != _log_clock[0]:
+        _log_clock[:] = [now, time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(now))]
+    return _log_clock[1]
+
+class StdoutHandler(logging.StreamHandler):
+    """StreamHandler writing to the sys.stdout of the moment, flushed once per batch
+
+    The stream is looked up on every write rather than bound at import, so a
+    replaced sys.stdout (pytest's capture, a redirect) is followed.
+    """
+
+    @property
+    def stream(self):
+        return sys.stdout
+
+    @stream.setter
+    def stream(self, value):
+        pass
+
+    def emit(self, record):
+        # Written without StreamHandler's flush per line; BatchedLogHandler
+        # flushes once the whole batch is out
+        try:
+            self.stream.write(self.format(record) + self.terminator)
+        except Exception:
+            self.handleError(record)
+
+class BatchedLogHandler(logging.handlers.MemoryHandler):
+    """MemoryHandler that also flushes once its oldest line is LOG_FLUSH_SECONDS old"""
+
+    def shouldFlush(self, record):
+        return super().shouldFlush(record) or record.created - self.buffer[0].created >= LOG_FLUSH_SECONDS
+
+    def flush(self):
+        super().flush()
+        if self.target is not None:
+            self.target.flush()
+
+# Log lines are held in memory and written in batches: once LOG_BUFFER_LINES
+# are waiting, once the oldest has waited LOG_FLUSH_SECONDS, straight away
+# from a WARNING, and at exit (SIGTERM included, see main()). A killed or
+# timed-out run still shows what went wrong. Call flush_log() before printing
+# to stdout directly.
+LOG_BUFFER_LINES = 50
+LOG_FLUSH_SECONDS = 2
+_stdout_handler = StdoutHandler()
+_stdout_handler.setFormatter(logging.Formatter("%(message)s"))
+log_buffer = BatchedLogHandler(LOG_BUFFER_LINES, flushLevel=logging.WARNING, target=_stdout_handler)
+logger = logging.getLogger("entity_processor")
+logger.propagate = False
+logger.addHandler(log_buffer)
+# georgia_parser's warnings go through the same buffer, in order with ours
+parser_logger = logging.getLogger("georgia_parser")
+parser_logger.propagate = False
+parser_logger.addHandler(log_buffer)
+
+def flush_log():
+    """Write out buffered log lines"""
+    log_buffer.flush()
+
+atexit.register(flush_log)
+
+def log(control_number, message, level="INFO", exc_info=False):
+    """Enhanced logging with timestamps and levels
+
+    Lines below LOG_LEVEL are dropped. Guard expensive messages with
+    logger.isEnabledFor() so they are not built at all. exc_info=True appends
+    the current traceback, which is only formatted if the line is kept.
+    """
+    logger.log(logging.getLevelName(level), f"[{log_timestamp()}] [{level}] [{control_number}] {message}", exc_info=exc_info)
+
+# A mistyped LOG_LEVEL falls back to DEBUG instead of failing the import
+LOG_LEVEL = (os.getenv("LOG_LEVEL") or "DEBUG").upper()
+try:
+    logger.setLevel(LOG_LEVEL)
+except ValueError:
+    logger.setLevel(logging.DEBUG)
+    log("startup", f"Unknown LOG_LEVEL {LOG_LEVEL!r}, logging at DEBUG", "WARNING")
+
+class AsyncArtifactWriter:
+    """Write debug artifacts (screenshots, HTML dumps) from a background thread
+
+    The scrape never reads these files back, so the browser session should not
+    wait on disk writes. Call flush() before the process exits.
+    """
+
+    def __init__(self):
+        self.pid = None
+        self.queue = None
+
+    def _ensure_worker(self):
+        # Threads do not survive a fork, so pool workers start their own
+        if self.pid != os.getpid():
+            self.pid = os.getpid()
+            self.queue = queue.Queue()
+            threading.Thread(target=self._run, name="artifact-writer", daemon=True).start()
+
+    def _run(self):
+        while True:
+            path, data = self.queue.get()
+            try:
+                with open(path, 'wb') as f:
+                    f.write(data)
+            except Exception as e:
+                log("artifact-writer", f"Error writing artifact {path}: {str(e)}", "ERROR")
+            finally:
+                self.queue.task_done()
+
+    def write(self, path, data):
+        """Queue bytes to be written to path and return immediately"""
+        self._ensure_worker()
+        self.queue.put((path, data))
+
+    def flush(self):
+        """Block until every queued artifact has been written"""
+        if self.pid == os.getpid():
+            self.queue.join()
+
+artifact_writer = AsyncArtifactWriter()
+atexit.register(artifact_writer.flush)
+
+def poll_until(sb, condition, timeout, interval=0.25):
+    """Poll condition() until it returns truthy or timeout seconds pass; errors count as not yet
+
+    Sleeps through sb.cdp.sleep so CDP events keep being processed while waiting.
+    """
+    end = time.time() + timeout
+    while True:
+        try:
+            if condition():
+                return True
+        except Exception:
+            pass
+        if time.time() >= end:
+            return False
+        sb.cdp.sleep(interval)
+
+# Created once here rather than checked before every artifact write
+os.makedirs("logs", exist_ok=True)
+
+# Lossy viewport-only JPEGs are much cheaper for Chrome to encode than PNGs
+SCREENSHOT_JPEG = os.getenv("SCREENSHOT_FORMAT", "png").lower() in ("jpg", "jpeg")
+
+# (filename, base64 image) captured during the current scrape; written to disk
+# by flush_screenshots() only if the scrape fails or DEBUG_ARTIFACTS is set
+screenshot_buffer = []
 
 def save_screenshot(sb, control_number, request_type="screenshot", context=""):
-    """Save screenshot from SeleniumBase browser with enhanced logging"""
+    """Capture a screenshot from SeleniumBase browser into screenshot_buffer"""
     try:
-        create_logs_folder()
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"logs/{control_number}_{request_type}_{context}_{timestamp}.png"
+        timestamp = time.strftime("%Y%m%d_%H%M%S")
+        extension = "jpg" if SCREENSHOT_JPEG else "png"
+        filename = f"logs/{control_number}_{request_type}_{context}_{timestamp}.{extension}"
+        
+        import mycdp
         
-        sb.save_screenshot(filename)
-        log(control_number, f"Screenshot saved: {filename}")
+        # Kept as base64 in memory; most scrapes succeed and never need it
+        if SCREENSHOT_JPEG:
+            capture = mycdp.page.capture_screenshot(format_="jpeg", quality=60, capture_beyond_viewport=False)
+        else:
+            capture = mycdp.page.capture_screenshot(format_="png")
+        image_data = sb.cdp.loop.run_until_complete(sb.cdp.page.send(capture))
+        screenshot_buffer.append((filename, image_data))
+        log(control_number, f"Screenshot captured: {filename}")
         return filename
     except Exception as e:
         log(control_number, f"Error saving screenshot: {str(e)}", "ERROR")
         return None
 
+def flush_screenshots(control_number, keep):
+    """Queue the buffered screenshots for writing if keep is true, then clear the buffer"""
+    if keep and screenshot_buffer:
+        log(control_number, f"Writing {len(screenshot_buffer)} buffered screenshot(s)")
+        for filename, image_data in screenshot_buffer:
+            artifact_writer.write(filename, base64.b64decode(image_data))
+    screenshot_buffer.clear()
+
 def save_html_content(control_number, html_content, request_type="content"):
     """Save HTML content to logs folder for debugging with enhanced logging"""
     try:
-        create_logs_folder()
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        timestamp = time.strftime("%Y%m%d_%H%M%S")
         filename = f"logs/{control_number}_{request_type}_{timestamp}.html"
         
-        with open(filename, 'w', encoding='utf-8') as f:
-            f.write(f"<!-- Control Number: {control_number} -->\n")
-            f.write(f"<!-- Request Type: {request_type} -->\n")
-            f.write(f"<!-- Timestamp: {timestamp} -->\n")
-            f.write("\n")
-            f.write(html_content)
+        header = (
+            f"<!-- Control Number: {control_number} -->\n"
+            f"<!-- Request Type: {request_type} -->\n"
+            f"<!-- Timestamp: {timestamp} -->\n"
+            "\n"
+        )
+        artifact_writer.write(filename, (header + html_content).encode('utf-8'))
         
-        log(control_number, f"HTML content saved: {filename} ({len(html_content)} chars)")
+        log(control_number, f"HTML content queued: {filename} ({len(html_content)} chars)")
         return filename
     except Exception as e:
         log(control_number, f"Error saving HTML content: {str(e)}", "ERROR")
@@ -60,57 +251,55 @@ def handle_cloudflare_captcha(sb, control_number):
     
     try:
         # Take before screenshot
-        save_screenshot(sb, control_number, "captcha", "before")
+        if DEBUG_ARTIFACTS:
+            save_screenshot(sb, control_number, "captcha", "before")
         
         # Check current page state
-        current_url = sb.get_current_url()
+        current_url = sb.cdp.get_current_url()
         log(control_number, f"Current URL: {current_url}")
         
-        # Check if we're on Cloudflare challenge page
-        if "challenges.cloudflare.com" in current_url or "ray id" in sb.get_page_source().lower():
+        # Check if we're on Cloudflare challenge page; serializing the page for
+        # the "ray id" marker is only worth it when debugging
+        if "challenges.cloudflare.com" in current_url or (
+            DEBUG_ARTIFACTS and "ray id" in sb.cdp.get_page_source().lower()
+        ):
             log(control_number, "Cloudflare challenge detected")
         else:
             log(control_number, "No obvious Cloudflare challenge detected")
         
+        # Every wait below returns as soon as the search input shows up
+        def search_ready():
+            return sb.cdp.is_element_present(SEARCH_INPUT)
+        
         # Try multiple approaches for GitHub Actions compatibility
-        try:
-            log(control_number, "Attempting GUI captcha methods...")
-            sb.sleep(2)
-            
-            # Method 1: Try the standard uc_gui methods with better error handling
+        if poll_until(sb, search_ready, timeout=2):
+            log(control_number, "Search page already available, skipping GUI captcha methods")
+        elif not GUI_CAPTCHA_CLICKS:
+            log(control_number, "GUI captcha methods disabled, trying extended wait approach...")
+        else:
+            # Method 1: Try the GUI captcha methods with better error handling
             try:
-                sb.uc_gui_click_captcha()
-                log(control_number, "uc_gui_click_captcha executed")
-                sb.sleep(3) 
+                log(control_number, "Attempting GUI captcha methods...")
+                sb.cdp.gui_click_captcha()
+                log(control_number, "cdp.gui_click_captcha executed")
                 
-                sb.uc_gui_handle_captcha()
-                log(control_number, "uc_gui_handle_captcha executed")
-                sb.sleep(2)
+                if not poll_until(sb, search_ready, timeout=3):
+                    sb.uc_gui_handle_captcha()
+                    log(control_number, "uc_gui_handle_captcha executed")
                 
             except Exception as gui_error:
                 log(control_number, f"GUI methods failed: {str(gui_error)}", "WARNING")
-                
-                # Method 2: Try undetected mode with longer waits
+                # Method 2: fall through to the extended wait for a potential auto-solve
                 log(control_number, "Trying extended wait approach...")
-                sb.sleep(8)  # Wait longer for potential auto-solve
-                
-        except Exception as outer_gui_error:
-            log(control_number, f"Outer GUI handling failed: {str(outer_gui_error)}", "WARNING")
         
         # Method 3: Check if we can proceed (captcha resolved or bypassed)
         log(control_number, "Checking if captcha is resolved...")
-        sb.sleep(3)
-        
-        # Look for the search input field to verify we're past captcha
-        search_input_present = False
-        try:
-            search_input_present = sb.is_element_present('input[id="txtControlNo"]')
-            log(control_number, f"Search input field present: {search_input_present}")
-        except Exception as check_error:
-            log(control_number, f"Error checking for search input: {str(check_error)}", "WARNING")
+        search_input_present = poll_until(sb, search_ready, timeout=15)
+        log(control_number, f"Search input field present: {search_input_present}")
         
         # Take after screenshot
-        save_screenshot(sb, control_number, "captcha", "after")
+        if DEBUG_ARTIFACTS:
+            save_screenshot(sb, control_number, "captcha", "after")
         
         elapsed_time = time.time() - start_time
         
@@ -119,18 +308,19 @@ def handle_cloudflare_captcha(sb, control_number):
             return True
         else:
             # Check current URL and page content for more debugging info
-            final_url = sb.get_current_url()
-            page_title = sb.get_title()
+            final_url = sb.cdp.get_current_url()
+            page_title = sb.cdp.get_title()
             log(control_number, f"Captcha handling completed but search field not found")
             log(control_number, f"Final URL: {final_url}")
             log(control_number, f"Page title: {page_title}")
             
             # Save page source for debugging
-            try:
-                page_source = sb.get_page_source()
-                save_html_content(control_number, page_source, "captcha_final_state")
-            except:
-                log(control_number, "Could not save final page source", "WARNING")
+            if DEBUG_ARTIFACTS:
+                try:
+                    page_source = sb.cdp.get_page_source()
+                    save_html_content(control_number, page_source, "captcha_final_state")
+                except:
+                    log(control_number, "Could not save final page source", "WARNING")
             
             save_screenshot(sb, control_number, "captcha", "still_blocked")
             log(control_number, f"Captcha not resolved after {elapsed_time:.2f}s", "WARNING")
@@ -139,25 +329,51 @@ def handle_cloudflare_captcha(sb, control_number):
     except Exception as e:
         elapsed_time = time.time() - start_time
         log(control_number, f"Error in captcha handling after {elapsed_time:.2f}s: {str(e)}", "ERROR")
-        log(control_number, f"Exception details: {traceback.format_exc()}", "DEBUG")
+        log(control_number, "Exception details:", "DEBUG", exc_info=True)
         save_screenshot(sb, control_number, "captcha", "failed")
         return False
 
-def get_value_by_label(table, label):
-    """Helper to get value by label in a table with logging"""
-    try:
-        for row in table.find_all("tr"):
-            tds = row.find_all("td")
-            for i, td in enumerate(tds):
-                if label in td.get_text(strip=True):
-                    # Value is in the next <td>
-                    if i + 1 < len(tds):
-                        value = tds[i + 1].get_text(strip=True)
-                        return value if value else None
-        return None
-    except Exception as e:
-        print(f"Error extracting value for label '{label}': {str(e)}")
-        return None
+def extract_section_fields(sections, title, labels, control_number, table_values):
+    """Read the labelled fields of one section, None for any label that is missing or empty
+
+    table_values caches table_to_dict() per table, since section titles can
+    share an enclosing table.
+    """
+    log(control_number, f"Parsing {title} section...")
+    table = sections.get(title)
+    if table is None:
+        log(control_number, f"{title} table not found", "WARNING")
+        return {}
+
+    log(control_number, f"{title} table found")
+    from georgia_parser import label_values, table_to_dict
+    if table not in table_values:
+        table_values[table] = table_to_dict(table)
+    fields = label_values(table_values[table], labels)
+    for field, value in fields.items():
+        if value:
+            log(control_number, f"Found {field}: {value}")
+    return fields
+
+def extract_officers(sections, control_number):
+    """Read the officer grid rows of the Officer Information section"""
+    log(control_number, "Parsing Officer Information section...")
+    officer_table = sections.get("Officer Information")
+    if officer_table is None:
+        log(control_number, "Officer Information table not found", "WARNING")
+        return []
+
+    log(control_number, "Officer Information table found")
+    from georgia_parser import read_officers
+    officers = read_officers(officer_table)
+    if not officers:
+        log(control_number, "Officer gridstyle table rows not found", "WARNING")
+        return officers
+
+    log(control_number, f"Found {len(officers)} officer rows")
+    for i, officer in enumerate(officers):
+        log(control_number, f"Officer {i+1}: {officer['Officer Name']} - {officer['Officer Title']}")
+    return officers
 
 def parse_georgia_business_data(html_content, control_number):
     """Parse Georgia business data from HTML content with enhanced logging"""
@@ -165,92 +381,35 @@ def parse_georgia_business_data(html_content, control_number):
     start_time = time.time()
     
     try:
-        soup = BeautifulSoup(html_content, "html.parser")
+        # lxml keeps the tree in C; elements are only wrapped when touched
+        from lxml import html as lxml_html
+        from georgia_parser import AGENT_LABELS, BUSINESS_LABELS, find_section_tables, slice_tables
+        # Only the tables are parsed; navigation, scripts and the footer are
+        # cut off first. document_fromstring wraps the slice in <html><body>.
+        tree = lxml_html.document_fromstring(slice_tables(html_content))
         data = {}
         
         # Log page structure for debugging
-        page_title = soup.find("title")
+        title_match = TITLE_PATTERN.search(html_content)
+        page_title = title_match.group(1).strip() if title_match else ""
         if page_title:
-            log(control_number, f"Page title: {page_title.get_text().strip()}")
+            log(control_number, f"Page title: {page_title}")
         
         # Check for common error indicators
         if "not found" in html_content.lower() or "error" in html_content.lower():
             log(control_number, "Potential error content detected in HTML", "WARNING")
 
-        # 1. Business Information
-        log(control_number, "Parsing Business Information section...")
-        business_info = {}
-        biz_table = soup.find("td", string=lambda s: s and "Business Information" in s)
-        if biz_table:
-            log(control_number, "Business Information table found")
-            biz_table = biz_table.find_parent("table")
-            
-            fields = [
-                "Business Name", "Control Number", "Business Type", "Business Status",
-                "Business Purpose", "Principal Office Address", 
-                "Date of Formation / Registration Date", "Jurisdiction",
-                "Last Annual Registration Year", "Dissolved Date"
-            ]
-            
-            for field in fields:
-                value = get_value_by_label(biz_table, field)
-                business_info[field] = value
-                if value:
-                    log(control_number, f"Found {field}: {value}")
-        else:
-            log(control_number, "Business Information table not found", "WARNING")
-            
+        # The tree and section lookup are built once and shared by every extractor
+        sections = find_section_tables(tree)
+        table_values = {}
+
+        business_info = extract_section_fields(sections, "Business Information", BUSINESS_LABELS, control_number, table_values)
         data["Business Information"] = business_info
 
-        # 2. Registered Agent Information
-        log(control_number, "Parsing Registered Agent Information section...")
-        agent_info = {}
-        agent_table = soup.find("td", string=lambda s: s and "Registered Agent Information" in s)
-        if agent_table:
-            log(control_number, "Registered Agent Information table found")
-            agent_table = agent_table.find_parent("table")
-            
-            agent_fields = ["Registered Agent Name", "Physical Address", "County"]
-            for field in agent_fields:
-                value = get_value_by_label(agent_table, field)
-                agent_info[field] = value
-                if value:
-                    log(control_number, f"Found {field}: {value}")
-        else:
-            log(control_number, "Registered Agent Information table not found", "WARNING")
-            
+        agent_info = extract_section_fields(sections, "Registered Agent Information", AGENT_LABELS, control_number, table_values)
         data["Registered Agent Information"] = agent_info
 
-        # 3. Officer Information
-        log(control_number, "Parsing Officer Information section...")
-        officers = []
-        officer_table = soup.find("td", string=lambda s: s and "Officer Information" in s)
-        if officer_table:
-            log(control_number, "Officer Information table found")
-            officer_table = officer_table.find_parent("table")
-            grid = officer_table.find("table", class_="gridstyle")
-            if grid:
-                tbody = grid.find("tbody")
-                if tbody:
-                    rows = tbody.find_all("tr")
-                    log(control_number, f"Found {len(rows)} officer rows")
-                    for i, row in enumerate(rows):
-                        cols = row.find_all("td")
-                        if len(cols) >= 3:
-                            officer = {
-                                "Officer Name": cols[0].get_text(strip=True),
-                                "Officer Title": cols[1].get_text(strip=True),
-                                "Officer Business Address": cols[2].get_text(strip=True)
-                            }
-                            officers.append(officer)
-                            log(control_number, f"Officer {i+1}: {officer['Officer Name']} - {officer['Officer Title']}")
-                else:
-                    log(control_number, "Officer table tbody not found", "WARNING")
-            else:
-                log(control_number, "Officer gridstyle table not found", "WARNING")
-        else:
-            log(control_number, "Officer Information table not found", "WARNING")
-            
+        officers = extract_officers(sections, control_number)
         data["Officer Information"] = officers
 
         elapsed_time = time.time() - start_time
@@ -261,156 +420,260 @@ def parse_georgia_business_data(html_content, control_number):
     except Exception as e:
         elapsed_time = time.time() - start_time
         log(control_number, f"Error parsing business data after {elapsed_time:.2f}s: {str(e)}", "ERROR")
-        log(control_number, f"Parse exception details: {traceback.format_exc()}", "DEBUG")
+        log(control_number, "Parse exception details:", "DEBUG", exc_info=True)
         return None
 
-def scrape_georgia_business(control_number, max_attempts=3):
-    """Scrape Georgia business data with comprehensive logging"""
+def fetch_details_html(sb, control_number, url):
+    """Fetch the business details page over HTTP using the browser's Cloudflare-cleared session
+
+    Returns the HTML, or None if Cloudflare refuses the replayed session.
+    """
+    try:
+        cookies = {cookie.name: cookie.value for cookie in sb.cdp.get_all_cookies()}
+        headers = {"User-Agent": sb.cdp.get_user_agent(), "Referer": SEARCH_URL}
+        log(control_number, f"Fetching business details over HTTP with {len(cookies)} browser cookies...")
+        import requests
+        response = requests.get(url, cookies=cookies, headers=headers, timeout=15)
+        if response.status_code != 200 or "just a moment" in response.text[:2000].lower():
+            log(control_number, f"HTTP fetch refused (status {response.status_code})", "WARNING")
+            return None
+        log(control_number, "Business details fetched over HTTP")
+        return response.text
+    except Exception as e:
+        log(control_number, f"HTTP fetch failed: {str(e)}", "WARNING")
+        return None
+
+def track_document_responses(sb):
+    """Record the request id of every document response on the current tab
+
+    Returns (request_ids, handler); pass the handler to untrack_document_responses.
+    """
+    import mycdp
+    request_ids = []
+
+    def on_response(event, connection=None):
+        if event.type_ == mycdp.network.ResourceType.DOCUMENT:
+            request_ids.append(event.request_id)
+
+    # Registering a Network handler enables the Network domain on the next command
+    sb.cdp.add_handler(mycdp.network.ResponseReceived, on_response)
+    return request_ids, on_response
+
+def untrack_document_responses(sb, handler):
+    """Remove a handler added by track_document_responses"""
+    import mycdp
+    try:
+        sb.cdp.page.handlers[mycdp.network.ResponseReceived].remove(handler)
+    except (KeyError, ValueError):
+        pass
+
+def get_document_body(sb, control_number, request_ids):
+    """Raw HTTP body of the last document response, or the serialized DOM if CDP can't provide it"""
+    if request_ids:
+        try:
+            import mycdp
+            body, base64_encoded = sb.cdp.loop.run_until_complete(
+                sb.cdp.page.send(mycdp.network.get_response_body(request_ids[-1]))
+            )
+            if base64_encoded:
+                body = base64.b64decode(body).decode('utf-8', errors='replace')
+            log(control_number, "Page source read from the document response body")
+            return body
+        except Exception as e:
+            log(control_number, f"Could not read document response body: {str(e)}", "WARNING")
+    return sb.cdp.get_page_source()
+
+def load_details_in_browser(sb, control_number, attempt, request_ids=()):
+    """Wait out any Cloudflare challenge on the opened details page and return its source
+
+    request_ids are document responses recorded by track_document_responses;
+    the last one is read back instead of serializing the DOM when possible.
+    """
+    # Handle Cloudflare captcha on business details page (conservative approach)
+    log(control_number, "Checking for captcha on business details page...")
+    page_title = sb.cdp.get_title()
+    log(control_number, f"Business details page title: {page_title}")
+    
+    if "just a moment" in page_title.lower() or "challenges.cloudflare.com" in sb.cdp.get_current_url():
+        log(control_number, "Cloudflare challenge detected on business details page")
+        log(control_number, "Using conservative wait approach (no GUI methods)")
+        
+        # Conservative approach - just wait without GUI methods that crash. The
+        # session cleared Cloudflare seconds ago on the search page, so a short
+        # wait usually suffices and the refresh below covers the rest.
+        if poll_until(sb, lambda: "just a moment" not in sb.cdp.get_title().lower(), timeout=8, interval=0.5):
+            log(control_number, f"Passed Cloudflare challenge with wait approach: {sb.cdp.get_title()}")
+        else:
+            log(control_number, "Still on Cloudflare page after waiting, trying page refresh...", "WARNING")
+            try:
+                sb.cdp.reload()
+                sb.cdp.sleep(5)
+                final_title = sb.cdp.get_title()
+                log(control_number, f"Title after refresh: {final_title}")
+            except Exception as refresh_error:
+                log(control_number, f"Page refresh failed: {str(refresh_error)}", "WARNING")
+    else:
+        log(control_number, "No Cloudflare challenge detected on business details page")
+    
+    # Save final screenshot
+    if DEBUG_ARTIFACTS:
+        save_screenshot(sb, control_number, "final_details", f"attempt_{attempt}")
+    
+    # Get page source
+    log(control_number, "Extracting page source...")
+    return get_document_body(sb, control_number, request_ids)
+
+def open_browser(user_data_dir=CHROME_PROFILE_DIR):
+    """Open a UC-mode SB context on a persistent Chrome profile"""
+    from seleniumbase import SB
+    return SB(uc=True, user_data_dir=os.path.abspath(user_data_dir), chromium_arg=CHROME_ARGS)
+
+def scrape_georgia_business(control_number, max_attempts=3, sb=None):
+    """Scrape Georgia business data with comprehensive logging
+
+    Retries reuse the same browser session. Pass an open SB instance to
+    share one browser across several control numbers.
+    """
+    if sb is None:
+        log(control_number, "Initializing SeleniumBase browser...")
+        with open_browser() as sb:
+            log(control_number, "Browser initialized successfully")
+            data = scrape_georgia_business(control_number, max_attempts, sb)
+            flush_screenshots(control_number, keep=DEBUG_ARTIFACTS or data is None)
+            return data
+
     log(control_number, f"Starting Georgia business scraping (max {max_attempts} attempts)")
     overall_start_time = time.time()
+    needs_new_session = False
     
     for attempt in range(1, max_attempts + 1):
         log(control_number, f"=== ATTEMPT {attempt}/{max_attempts} ===")
         attempt_start_time = time.time()
         
         try:
-            log(control_number, "Initializing SeleniumBase browser...")
-            with SB(uc=True, test=True) as sb:
-                log(control_number, "Browser initialized successfully")
-                
-                url = "https://ecorp.sos.ga.gov/BusinessSearch"
-                log(control_number, f"Navigating to: {url}")
-                sb.activate_cdp_mode(url)
-                log(control_number, "CDP mode activated")
+            if needs_new_session:
+                # Cloudflare kept blocking this session; start a clean driver in place
+                log(control_number, "Starting a clean browser driver...")
+                sb.get_new_driver(undetectable=True)
+                needs_new_session = False
+
+            url = SEARCH_URL
+            log(control_number, f"Navigating to: {url}")
+            sb.activate_cdp_mode(url)
+            log(control_number, "CDP mode activated")
 
-                # Save initial screenshot
+            # Save initial screenshot
+            if DEBUG_ARTIFACTS:
                 save_screenshot(sb, control_number, "initial", f"attempt_{attempt}")
-                log(control_number, "Initial page loaded")
+            log(control_number, "Initial page loaded")
 
-                # Handle Cloudflare captcha on initial page
+            # A session that already cleared Cloudflare lands straight on the
+            # search form, so the captcha handling only runs when it is missing
+            if sb.cdp.is_element_present(SEARCH_INPUT):
+                log(control_number, "Search page ready, session already past Cloudflare")
+                captcha_success = True
+            else:
                 log(control_number, "Starting initial captcha handling...")
                 captcha_success = handle_cloudflare_captcha(sb, control_number)
-                
-                if not captcha_success:
-                    log(control_number, "Captcha handling failed, but continuing anyway...", "WARNING")
-
-                # Now proceed with the search
-                log(control_number, "Proceeding with business search...")
-                                
-                # Type control number
-                control_input = 'input[id="txtControlNo"]'
-                log(control_number, f"Looking for search input field: {control_input}")
-                
-                try:
-                    if sb.is_element_present(control_input):
-                        log(control_number, f"Typing control number: {control_number}")
-                        sb.cdp.type(control_input, control_number)
-                        log(control_number, "Control number entered successfully")
-                    else:
-                        log(control_number, "Search input field not found", "ERROR")
-                        save_screenshot(sb, control_number, "error", f"no_search_field_attempt_{attempt}")
-                        continue
-                except Exception as type_error:
-                    log(control_number, f"Error typing control number: {str(type_error)}", "ERROR")
-                    continue
-                
-                # Click search button
-                search_button = 'input[id="btnSearch"]'
-                log(control_number, f"Clicking search button: {search_button}")
-                try:
-                    sb.cdp.click(search_button)
-                    log(control_number, "Search button clicked")
-                    sb.sleep(3)  # Wait for search results
-                except Exception as click_error:
-                    log(control_number, f"Error clicking search button: {str(click_error)}", "ERROR")
-                    continue
-                
+            
+            if not captcha_success:
+                log(control_number, "Captcha handling failed, but continuing anyway...", "WARNING")
+
+            # Now proceed with the search
+            log(control_number, "Proceeding with business search...")
+                            
+            # Type control number
+            control_input = SEARCH_INPUT
+            log(control_number, f"Looking for search input field: {control_input}")
+            
+            # type() locates the field itself and raises if it never appears
+            try:
+                log(control_number, f"Typing control number: {control_number}")
+                sb.cdp.type(control_input, control_number, timeout=3)
+                log(control_number, "Control number entered successfully")
+            except Exception as type_error:
+                log(control_number, f"Search input field not found: {str(type_error)}", "ERROR")
+                save_screenshot(sb, control_number, "error", f"no_search_field_attempt_{attempt}")
+                needs_new_session = not captcha_success
+                continue
+            
+            # Click search button
+            search_button = 'input[id="btnSearch"]'
+            log(control_number, f"Clicking search button: {search_button}")
+            try:
+                sb.cdp.click(search_button)
+                log(control_number, "Search button clicked")
+                sb.cdp.sleep(3)  # Wait for search results
+            except Exception as click_error:
+                log(control_number, f"Error clicking search button: {str(click_error)}", "ERROR")
+                continue
+            
+            if DEBUG_ARTIFACTS:
                 save_screenshot(sb, control_number, "search_results", f"attempt_{attempt}")
+            
+            # Click on the business link in results
+            log(control_number, "Looking for business details link in search results...")
+            business_link_selector = 'td > a'
+            try:
+                url_entity = sb.cdp.get_element_attribute(business_link_selector, 'href', timeout=10)
+                log(control_number, f"Found business link: {url_entity}")
                 
-                # Click on the business link in results
-                log(control_number, "Looking for business details link in search results...")
-                business_link_selector = 'td > a'
+            except Exception as link_error:
+                log(control_number, f"Error finding business link: {str(link_error)}", "ERROR")
+                save_screenshot(sb, control_number, "error", f"no_business_link_attempt_{attempt}")
+                continue
+            
+            # Replay the cleared session over plain HTTP first; only render the
+            # details page in the browser if Cloudflare refuses it
+            url_entity = urljoin(SEARCH_URL, url_entity)
+            html = fetch_details_html(sb, control_number, url_entity)
+            if html is None:
+                request_ids, on_response = track_document_responses(sb)
                 try:
-                    sb.cdp.wait_for_element_visible(business_link_selector, timeout=10)
-                    url_entity = sb.cdp.get_element_attribute(business_link_selector, 'href')
-                    log(control_number, f"Found business link: {url_entity}")
-                    
-                    log(control_number, "Navigating to business details page...")
-                    sb.cdp.get(url_entity)
-                    log(control_number, "Business details page loaded")
-                    
-                except Exception as link_error:
-                    log(control_number, f"Error finding/clicking business link: {str(link_error)}", "ERROR")
-                    save_screenshot(sb, control_number, "error", f"no_business_link_attempt_{attempt}")
-                    continue
-                
-                # Handle Cloudflare captcha on business details page (conservative approach)
-                log(control_number, "Checking for captcha on business details page...")
-                page_title = sb.get_title()
-                log(control_number, f"Business details page title: {page_title}")
-                
-                if "just a moment" in page_title.lower() or "challenges.cloudflare.com" in sb.get_current_url():
-                    log(control_number, "Cloudflare challenge detected on business details page")
-                    log(control_number, "Using conservative wait approach (no GUI methods)")
-                    
-                    # Conservative approach - just wait without GUI methods that crash
-                    for wait_attempt in range(6):  # Try waiting up to 30 seconds
-                        log(control_number, f"Wait attempt {wait_attempt + 1}/6...")
-                        sb.sleep(5)
-                        
-                        # Check if we're past the challenge
-                        current_title = sb.get_title()
-                        log(control_number, f"Current title after wait: {current_title}")
-                        
-                        if "just a moment" not in current_title.lower():
-                            log(control_number, "Passed Cloudflare challenge with wait approach")
-                            break
-                    else:
-                        log(control_number, "Still on Cloudflare page after waiting, trying page refresh...", "WARNING")
-                        try:
-                            sb.refresh()
-                            sb.sleep(5)
-                            final_title = sb.get_title()
-                            log(control_number, f"Title after refresh: {final_title}")
-                        except Exception as refresh_error:
-                            log(control_number, f"Page refresh failed: {str(refresh_error)}", "WARNING")
-                else:
-                    log(control_number, "No Cloudflare challenge detected on business details page")
-                
-                # Save final screenshot
-                save_screenshot(sb, control_number, "final_details", f"attempt_{attempt}")
-                
-                # Get page source
-                log(control_number, "Extracting page source...")
-                html = sb.cdp.get_page_source()
-                log(control_number, f"Page source extracted ({len(html)} characters)")
-                save_html_content(control_number, html, "business_details")
-                
-                # Parse the data
-                log(control_number, "Starting data parsing...")
-                data = parse_georgia_business_data(html, control_number)
-                
-                attempt_time = time.time() - attempt_start_time
-                
-                if data and data.get("Business Information", {}).get("Control Number"):
-                    log(control_number, f"Scraping successful on attempt {attempt} ({attempt_time:.2f}s)")
-                    overall_time = time.time() - overall_start_time
-                    log(control_number, f"Total scraping time: {overall_time:.2f}s")
-                    return data
-                else:
-                    log(control_number, f"Failed to parse valid data on attempt {attempt} ({attempt_time:.2f}s)", "WARNING")
-                    if data:
-                        log(control_number, f"Parsed data: {json.dumps(data, indent=2)}", "DEBUG")
-                    if attempt < max_attempts:
-                        log(control_number, "Will retry with new browser session...")
+                    try:
+                        log(control_number, "Navigating to business details page...")
+                        sb.cdp.get(url_entity)
+                        log(control_number, "Business details page loaded")
+                    except Exception as nav_error:
+                        log(control_number, f"Error opening business details page: {str(nav_error)}", "ERROR")
+                        save_screenshot(sb, control_number, "error", f"no_business_details_attempt_{attempt}")
                         continue
-                
+                    html = load_details_in_browser(sb, control_number, attempt, request_ids)
+                finally:
+                    untrack_document_responses(sb, on_response)
+            
+            log(control_number, f"Page source extracted ({len(html)} characters)")
+            
+            # Parse the data
+            log(control_number, "Starting data parsing...")
+            data = parse_georgia_business_data(html, control_number)
+            parsed = bool(data and data.get("Business Information", {}).get("Control Number"))
+            if DEBUG_ARTIFACTS or not parsed:
+                save_html_content(control_number, html, "business_details")
+            
+            attempt_time = time.time() - attempt_start_time
+            
+            if parsed:
+                log(control_number, f"Scraping successful on attempt {attempt} ({attempt_time:.2f}s)")
+                overall_time = time.time() - overall_start_time
+                log(control_number, f"Total scraping time: {overall_time:.2f}s")
+                return data
+            else:
+                log(control_number, f"Failed to parse valid data on attempt {attempt} ({attempt_time:.2f}s)", "WARNING")
+                if data and logger.isEnabledFor(logging.DEBUG):
+                    import orjson
+                    log(control_number, f"Parsed data: {orjson.dumps(data, option=orjson.OPT_INDENT_2).decode()}", "DEBUG")
+                if attempt < max_attempts:
+                    log(control_number, "Will retry in the same browser session...")
+                    continue
+            
         except Exception as e:
             attempt_time = time.time() - attempt_start_time
             log(control_number, f"Error on attempt {attempt} after {attempt_time:.2f}s: {str(e)}", "ERROR")
-            log(control_number, f"Attempt exception details: {traceback.format_exc()}", "DEBUG")
+            log(control_number, "Attempt exception details:", "DEBUG", exc_info=True)
             if attempt < max_attempts:
-                log(control_number, "Retrying with new browser session...")
+                log(control_number, "Retrying with a clean browser driver...")
+                needs_new_session = True
                 continue
             else:
                 log(control_number, "All attempts exhausted", "ERROR")
@@ -420,80 +683,166 @@ def scrape_georgia_business(control_number, max_attempts=3):
     log(control_number, f"Scraping failed after all attempts. Total time: {overall_time:.2f}s", "ERROR")
     return None
 
+def parse_args():
+    """Command line options for the processor"""
+    parser = argparse.ArgumentParser(description="Georgia Business Entity Processor")
+    parser.add_argument("control_numbers", nargs="*", help="control numbers to scrape")
+    parser.add_argument("--batch", metavar="FILE", help="read control numbers from FILE, one per line")
+    parser.add_argument("--pretty", action="store_true", help="indent the JSON results file")
+    return parser.parse_args()
+
+def read_control_numbers(args):
+    """Control numbers from the command line and --batch file, or one per line on stdin if none are given"""
+    control_numbers = [arg.strip() for arg in args.control_numbers if arg.strip()]
+    if args.batch:
+        with open(args.batch, encoding='utf-8') as f:
+            control_numbers.extend(line.strip() for line in f if line.strip())
+    if not control_numbers and not sys.stdin.isatty():
+        control_numbers = [line.strip() for line in sys.stdin if line.strip()]
+    # A repeated number would be scraped twice and overwrite its own record
+    return list(dict.fromkeys(control_numbers))
+
+def scrape_batch(control_numbers, user_data_dir=CHROME_PROFILE_DIR):
+    """Scrape control numbers in one browser session, returns {control_number: (data, seconds)}
+
+    Used directly for a single worker and as the process pool task otherwise,
+    so every worker process owns its own SB context and Chrome profile.
+    """
+    results = {}
+    try:
+        with open_browser(user_data_dir) as sb:
+            for control_number in control_numbers:
+                entity_start_time = time.time()
+                log(control_number, "Starting main scraping process...")
+                data = scrape_georgia_business(control_number, sb=sb)
+                flush_screenshots(control_number, keep=DEBUG_ARTIFACTS or data is None)
+                results[control_number] = (data, time.time() - entity_start_time)
+    finally:
+        # Pool workers exit without running atexit hooks
+        artifact_writer.flush()
+        flush_log()
+    return results
+
+def worker_count(control_numbers):
+    """Browser processes for the batch: MAX_WORKERS, or DEFAULT_WORKERS if it is unset or not a number"""
+    setting = os.getenv("MAX_WORKERS")
+    try:
+        workers = int(setting) if setting else DEFAULT_WORKERS
+    except ValueError:
+        log("startup", f"Invalid MAX_WORKERS {setting!r}, using {DEFAULT_WORKERS}", "WARNING")
+        workers = DEFAULT_WORKERS
+    return max(1, min(workers, len(control_numbers)))
+
+def build_result(control_number, request_id, data, total_time):
+    """Print the outcome for one control number and build its result record"""
+    flush_log()
+    if data and data.get("Business Information", {}).get("Control Number"):
+        print("\n" + "=" * 50)
+        print("SCRAPING SUCCESSFUL")
+        print("=" * 50)
+        log(control_number, f"Total execution time: {total_time:.2f}s")
+        flush_log()
+        print("Business data extracted:")
+        import orjson
+        print(orjson.dumps(data, option=orjson.OPT_INDENT_2).decode())
+        
+        return {
+            "success": True,
+            "control_number": control_number,
+            "request_id": request_id,
+            "execution_time_seconds": round(total_time, 2),
+            "timestamp": datetime.now().strftime('%Y-%m-%d %H:%M:%S UTC'),
+            "data": data
+        }
+        
+    print("\n" + "=" * 50)
+    print("SCRAPING FAILED")
+    print("=" * 50)
+    log(control_number, f"Failed after {total_time:.2f}s", "ERROR")
+    
+    return {
+        "success": False,
+        "error": "Failed to extract business data",
+        "control_number": control_number,
+        "request_id": request_id,
+        "execution_time_seconds": round(total_time, 2),
+        "timestamp": datetime.now().strftime('%Y-%m-%d %H:%M:%S UTC'),
+        "data": data if data else {}
+    }
+
 def main():
     """Main function with comprehensive logging"""
     start_time = time.time()
+    # A SIGTERM (runner timeout, docker stop) exits through atexit, so the
+    # buffered log lines and queued artifacts are written out first
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(128 + signum))
     
     try:
-        if len(sys.argv) != 2:
-            print("Usage: python entity_processor.py <control_number>")
+        args = parse_args()
+        control_numbers = read_control_numbers(args)
+        if not control_numbers:
+            print("Usage: python entity_processor.py <control_number> [<control_number> ...]")
+            print("       python entity_processor.py --batch numbers.txt")
+            print("       (or pipe control numbers on stdin, one per line)")
             sys.exit(1)
         
-        control_number = sys.argv[1].strip()
-        request_id = os.getenv('REQUEST_ID', str(uuid.uuid4()))
+        request_id = os.getenv('REQUEST_ID') or os.urandom(8).hex()
+        workers = worker_count(control_numbers)
         
         print("=" * 60)
         print("Georgia Business Entity Processor")
         print("=" * 60)
-        print(f"Control Number: {control_number}")
+        print(f"Control Number(s): {', '.join(control_numbers)}")
         print(f"Request ID: {request_id}")
+        print(f"Browser Workers: {workers}")
         print(f"Start Time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S UTC')}")
         print(f"Python Version: {sys.version}")
         print("=" * 60)
         
-        # Scrape the business data
-        log(control_number, "Starting main scraping process...")
-        data = scrape_georgia_business(control_number)
+        if workers == 1:
+            results = scrape_batch(control_numbers)
+        else:
+            # Selenium is not thread-safe, so each worker is a process with its
+            # own browser working through an interleaved slice of the batch
+            results = {}
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                futures = {
+                    pool.submit(scrape_batch, control_numbers[i::workers], f"{CHROME_PROFILE_DIR}-{i}"): control_numbers[i::workers]
+                    for i in range(workers)
+                }
+                for future in as_completed(futures):
+                    try:
+                        results.update(future.result())
+                    except Exception as e:
+                        print(f"Browser worker failed for {', '.join(futures[future])}: {str(e)}")
         
-        total_time = time.time() - start_time
+        records = {}
+        for control_number in control_numbers:
+            data, total_time = results.get(control_number, (None, 0.0))
+            records[control_number] = build_result(control_number, request_id, data, total_time)
+        failures = sum(1 for record in records.values() if not record["success"])
         
-        if data and data.get("Business Information", {}).get("Control Number"):
-            print("\n" + "=" * 50)
-            print("SCRAPING SUCCESSFUL")
-            print("=" * 50)
-            log(control_number, f"Total execution time: {total_time:.2f}s")
-            print("Business data extracted:")
-            print(json.dumps(data, indent=2, ensure_ascii=False))
-            
-            # Save results to file for artifact upload
+        # Save results to a single file for artifact upload: the record itself
+        # for one control number, otherwise one JSON record per line
+        import orjson
+        if len(control_numbers) == 1:
             output_filename = f"processed_data_{request_id}.json"
-            with open(output_filename, 'w', encoding='utf-8') as f:
-                json.dump({
-                    "success": True,
-                    "control_number": control_number,
-                    "request_id": request_id,
-                    "execution_time_seconds": round(total_time, 2),
-                    "timestamp": datetime.now().strftime('%Y-%m-%d %H:%M:%S UTC'),
-                    "data": data
-                }, f, indent=2, ensure_ascii=False)
-            
-            log(control_number, f"Results saved to: {output_filename}")
-            
+            option = orjson.OPT_INDENT_2 if args.pretty else 0
+            with open(output_filename, 'wb') as f:
+                f.write(orjson.dumps(records[control_numbers[0]], option=option))
         else:
-            print("\n" + "=" * 50)
-            print("SCRAPING FAILED")
-            print("=" * 50)
-            log(control_number, f"Failed after {total_time:.2f}s", "ERROR")
-            
-            # Create error result file
-            error_data = {
-                "success": False,
-                "error": "Failed to extract business data",
-                "control_number": control_number,
-                "request_id": request_id,
-                "execution_time_seconds": round(total_time, 2),
-                "timestamp": datetime.now().strftime('%Y-%m-%d %H:%M:%S UTC'),
-                "data": data if data else {}
-            }
-            
-            output_filename = f"processed_data_{request_id}.json"
-            with open(output_filename, 'w', encoding='utf-8') as f:
-                json.dump(error_data, f, indent=2, ensure_ascii=False)
-            
-            log(control_number, f"Error results saved to: {output_filename}")
+            output_filename = f"processed_data_{request_id}.jsonl"
+            with open(output_filename, 'wb') as f:
+                f.writelines(orjson.dumps(records[control_number], option=orjson.OPT_APPEND_NEWLINE)
+                             for control_number in control_numbers)
+        print(f"\nResults saved to: {output_filename}")
+        
+        if failures:
+            print(f"{failures}/{len(control_numbers)} control number(s) failed after {time.time() - start_time:.2f}s")
             sys.exit(1)
             
     except Exception as e:
+        flush_log()
         total_time = time.time() - start_time
         print(f"\nFATAL ERROR after {total_time:.2f}s: {str(e)}")
         print("Full traceback:")
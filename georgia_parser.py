@@ -0,0 +1,108 @@
+"""
+Georgia business details page parser
+Shared by entity_processor.py and windows_scraper.py, so both return the same
+record for the same page. Importing it has no side effects: no logging setup,
+no directories and no exit hooks.
+"""
+
+import logging
+import re
+from lxml import etree
+
+logger = logging.getLogger(__name__)
+
+# Labels read from the Business Information and Registered Agent Information tables
+BUSINESS_LABELS = (
+    "Business Name", "Control Number", "Business Type", "Business Status",
+    "Business Purpose", "Principal Office Address",
+    "Date of Formation / Registration Date", "Jurisdiction",
+    "Last Annual Registration Year", "Dissolved Date"
+)
+AGENT_LABELS = ("Registered Agent Name", "Physical Address", "County")
+# Keys for the first three columns of each officer grid row
+OFFICER_FIELDS = ("Officer Name", "Officer Title", "Officer Business Address")
+
+# Section titles, matched together so the page is walked once for all three
+SECTION_LABELS = ("Business Information", "Registered Agent Information", "Officer Information")
+SECTION_TITLES = frozenset(SECTION_LABELS)
+SECTION_PATTERN = re.compile("|".join(map(re.escape, SECTION_LABELS)))
+# Innermost cells whose whole text holds a title, so titles wrapped in <b> or
+# <span> are found too. Compiled once here instead of on every parse.
+SECTION_CELLS_XPATH = etree.XPath("//td[not(.//td)][{}]".format(
+    " or ".join(f"contains(normalize-space(.), '{label}')" for label in SECTION_LABELS)
+))
+# Officer grid cells, flat in document order: first gridstyle table -> its
+# first tbody -> the first three cells of every row that has at least three
+OFFICER_CELLS_XPATH = etree.XPath(
+    "(.//table[contains(concat(' ', normalize-space(@class), ' '), ' gridstyle ')])[1]"
+    "/descendant::tbody[1]//tr[count(.//td) >= 3]/descendant::td[position() <= 3]"
+)
+
+def get_cell_text(cell):
+    """Get the stripped text of a cell, joined the same way as BeautifulSoup's get_text(strip=True)"""
+    # Most cells hold a single text node; skip the itertext generator for those
+    if not len(cell):
+        return (cell.text or "").strip()
+    return "".join(s.strip() for s in cell.itertext())
+
+def find_section_tables(tree):
+    """Find the table enclosing each section title <td>, keyed by section title"""
+    sections = {}
+    for td in SECTION_CELLS_XPATH(tree):
+        # Normalised like the XPath's normalize-space(), so a title split
+        # across tags or lines still reads as one string
+        text = " ".join(td.text_content().split())
+        # Header cells usually hold just the title; fall back to the regex otherwise
+        if text in SECTION_TITLES:
+            title = text
+        else:
+            match = SECTION_PATTERN.search(text)
+            title = match.group(0) if match else None
+        if title and title not in sections:
+            table = next(td.iterancestors("table"), None)
+            if table is not None:
+                sections[title] = table
+                if len(sections) == len(SECTION_TITLES):
+                    break
+    return sections
+
+def table_to_dict(table):
+    """Map each label cell in a table to the text of the cell after it, in a single pass"""
+    out = {}
+    try:
+        for row in table.iter("tr"):
+            # Each cell's text is built once and used as both label and value
+            texts = [get_cell_text(td) for td in row.iter("td")]
+            for i in range(len(texts) - 1):
+                # Labels match exactly once the colon is dropped, not by
+                # substring as get_value_by_label did; the first one wins
+                label = texts[i].rstrip(":").strip()
+                if label and label not in out:
+                    out[label] = texts[i + 1]
+        return out
+    except Exception as e:
+        logger.warning(f"Error extracting label values from table: {str(e)}")
+        return out
+
+def slice_tables(html_content):
+    """Cut the page down to the span of its tables, or return it unchanged if it has none
+
+    Everything the parser needs lies between the first <table of the body and
+    the last </table>. The head is skipped because its scripts may contain
+    markup strings.
+    """
+    start = html_content.find("<table", max(html_content.find("<body"), 0))
+    end = html_content.rfind("</table>")
+    if start == -1 or end < start:
+        return html_content
+    return html_content[start:end + len("</table>")]
+
+def label_values(values, labels):
+    """Pick labels out of a table_to_dict() map, None for any that is missing or empty"""
+    return {label: values.get(label) or None for label in labels}
+
+def read_officers(officer_table):
+    """Read the first three cells of every officer grid row that has at least three"""
+    # The row filter runs in libxml2; the flat cell list is cut back into rows of three
+    cells = [get_cell_text(td) for td in OFFICER_CELLS_XPATH(officer_table)]
+    return [dict(zip(OFFICER_FIELDS, row)) for row in zip(*[iter(cells)] * 3)]
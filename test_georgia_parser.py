@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+Offline parser tests for the Georgia business details page
+Run with: python -m pytest test_georgia_parser.py
+"""
+
+import pytest
+import windows_scraper
+from entity_processor import parse_georgia_business_data
+from georgia_parser import find_section_tables, read_officers, slice_tables, table_to_dict
+from lxml import html as lxml_html
+from windows_scraper import parse_business_html, parse_cached, slice_section_tables
+
+# A details page trimmed from a real response: markup in the head, a label
+# wrapped in <strong>, a nested officer grid and a footer table
+BUSINESS_PAGE = """<!DOCTYPE html>
+<html><head><title>Business Search - Business Information</title>
+<script>var x = "<table><td>Business Information</td></table>";</script>
+</head>
+<body>
+<div id="header"><ul><li><a href="/">Home</a></li></ul></div>
+<form method="post" action="/BusinessSearch/BusinessInformation?businessId=123">
+<table id="MainContent_tblBusinessInfo" class="data_pannel">
+<tbody>
+<tr><td colspan="4" class="filter_header">Business Information</td></tr>
+<tr><td><strong>Business Name:</strong></td><td>A &amp; F CONTRACTORS, INC. (ALABAMA)</td><td>Control Number:</td><td>K805670</td></tr>
+<tr><td>Business Type:</td><td>Foreign Profit Corporation</td><td>Business Status:</td><td>Admin. Dissolved</td></tr>
+<tr><td>Business Purpose:</td><td>NONE</td></tr>
+<tr><td>Principal Office Address:</td><td>6825 OAKVIEW LN, COTTONDALE, AL, 35453-3912, USA</td><td>Date of Formation / Registration Date:</td><td>1/20/1998</td></tr>
+<tr><td>Jurisdiction:</td><td>Alabama</td><td>Last Annual Registration Year:</td><td>2003</td></tr>
+<tr><td>Dissolved Date:</td><td></td></tr>
+</tbody></table>
+<table class="data_pannel">
+<tbody>
+<tr><td colspan="4">Registered Agent Information</td></tr>
+<tr><td>Registered Agent Name:</td><td>C T CORPORATION SYSTEM</td></tr>
+<tr><td>Physical Address:</td><td>1201 Peachtree Street, NE, Atlanta, GA, 30361, USA</td></tr>
+<tr><td>County:</td><td>Fulton</td></tr>
+</tbody></table>
+<table class="data_pannel">
+<tbody>
+<tr><td>Officer Information</td></tr>
+<tr><td>
+<table class="gridstyle">
+<thead><tr><th>Name</th><th>Title</th><th>Business Address</th></tr></thead>
+<tbody>
+<tr><td>JAMES B. ALBRIGHT</td><td>CFO</td><td>6825 OAKVIEW LN, COTTONDALE, AL, 35453, USA</td></tr>
+<tr><td>MARY SMITH</td><td>CEO</td><td>1 MAIN ST, <br/>TUSCALOOSA, AL, 35401, USA</td></tr>
+<tr><td colspan="3">Page 1 of 1</td></tr>
+</tbody></table>
+</td></tr>
+</tbody></table>
+</form>
+<div id="footer"><table><tr><td>Footer links</td><td>Contact</td></tr></table></div>
+</body></html>
+"""
+
+EXPECTED = {
+    "Business Information": {
+        "Business Name": "A & F CONTRACTORS, INC. (ALABAMA)",
+        "Control Number": "K805670",
+        "Business Type": "Foreign Profit Corporation",
+        "Business Status": "Admin. Dissolved",
+        "Business Purpose": "NONE",
+        "Principal Office Address": "6825 OAKVIEW LN, COTTONDALE, AL, 35453-3912, USA",
+        "Date of Formation / Registration Date": "1/20/1998",
+        "Jurisdiction": "Alabama",
+        "Last Annual Registration Year": "2003",
+        "Dissolved Date": None,
+    },
+    "Registered Agent Information": {
+        "Registered Agent Name": "C T CORPORATION SYSTEM",
+        "Physical Address": "1201 Peachtree Street, NE, Atlanta, GA, 30361, USA",
+        "County": "Fulton",
+    },
+    "Officer Information": [
+        {
+            "Officer Name": "JAMES B. ALBRIGHT",
+            "Officer Title": "CFO",
+            "Officer Business Address": "6825 OAKVIEW LN, COTTONDALE, AL, 35453, USA",
+        },
+        {
+            "Officer Name": "MARY SMITH",
+            "Officer Title": "CEO",
+            "Officer Business Address": "1 MAIN ST,TUSCALOOSA, AL, 35401, USA",
+        },
+    ],
+}
+
+# Section titles wrapped in inline markup instead of sitting in the cell text
+WRAPPED_TITLES_PAGE = (
+    BUSINESS_PAGE
+    .replace('class="filter_header">Business Information<', 'class="filter_header"><b>Business Information</b><')
+    .replace(">Registered Agent Information<", "><span>Registered Agent\n  Information</span><")
+    .replace("<td>Officer Information</td>", "<td><strong>Officer Information</strong></td>")
+)
+
+# A label from one section repeated in another section's table
+REPEATED_LABEL_PAGE = BUSINESS_PAGE.replace(
+    "<tr><td>Business Purpose:</td><td>NONE</td></tr>",
+    "<tr><td>Business Purpose:</td><td>NONE</td></tr>\n"
+    "<tr><td>County:</td><td>Tuscaloosa</td><td>Physical Address:</td><td>6825 OAKVIEW LN</td></tr>",
+)
+
+# Section titles repeated in a <th> tab row and a <caption> ahead of the real tables
+TAB_ROW_PAGE = BUSINESS_PAGE.replace(
+    '<table id="MainContent_tblBusinessInfo"',
+    "<table><tr><th>Business Information</th><th>Registered Agent Information</th>"
+    "<th>Officer Information</th></tr></table>\n"
+    "<table><caption>Officer Information</caption><tr><td>Summary</td></tr></table>\n"
+    '<table id="MainContent_tblBusinessInfo"',
+)
+
+def test_parse_business_page():
+    """Every field of the realistic page is read from its own section"""
+    assert parse_georgia_business_data(BUSINESS_PAGE, "TEST") == EXPECTED
+
+def test_find_section_tables():
+    """Each title maps to the innermost table around it, not the head script or footer"""
+    tree = lxml_html.document_fromstring(BUSINESS_PAGE)
+    sections = find_section_tables(tree)
+    assert set(sections) == {"Business Information", "Registered Agent Information", "Officer Information"}
+    assert sections["Business Information"].get("id") == "MainContent_tblBusinessInfo"
+
+def test_wrapped_section_titles():
+    """Titles inside <b>, <span> or <strong> are still found"""
+    tree = lxml_html.document_fromstring(WRAPPED_TITLES_PAGE)
+    assert len(find_section_tables(tree)) == 3
+    assert parse_georgia_business_data(WRAPPED_TITLES_PAGE, "TEST") == EXPECTED
+
+def test_label_repeated_across_sections():
+    """A label is read from its own section's table, not the first table that has it"""
+    assert parse_georgia_business_data(REPEATED_LABEL_PAGE, "TEST") == EXPECTED
+
+@pytest.mark.parametrize("page", [BUSINESS_PAGE, WRAPPED_TITLES_PAGE, REPEATED_LABEL_PAGE, TAB_ROW_PAGE])
+def test_windows_scraper_matches_entity_processor(page):
+    """Both scrapers return the same record, empty values and all"""
+    assert parse_business_html(page) == EXPECTED
+
+def test_slice_section_tables():
+    """The slice holds exactly the three section tables, nested grid included"""
+    for page in (BUSINESS_PAGE, TAB_ROW_PAGE):
+        sliced = slice_section_tables(page)
+        assert sliced.count('class="data_pannel"') == 3
+        assert 'class="gridstyle"' in sliced
+        assert "<th>Business Information</th>" not in sliced
+        assert "Footer links" not in sliced
+
+def test_slice_section_tables_needs_every_title():
+    """A page missing a section title is left to slice_tables"""
+    assert slice_section_tables(BUSINESS_PAGE.replace("Officer Information", "Officers")) is None
+
+def test_parse_cached(tmp_path, monkeypatch):
+    """A stored record is served for the same page and parser version only"""
+    monkeypatch.setattr(windows_scraper, "PARSE_CACHE", True)
+    monkeypatch.setattr(windows_scraper, "PARSE_CACHE_DIR", str(tmp_path))
+    assert parse_cached(BUSINESS_PAGE) == EXPECTED
+    (cached,) = tmp_path.iterdir()
+    cached.write_bytes(b'{"from": "cache"}')
+    assert parse_cached(BUSINESS_PAGE) == {"from": "cache"}
+    monkeypatch.setattr(windows_scraper, "PARSER_VERSION", windows_scraper.PARSER_VERSION + 1)
+    assert parse_cached(BUSINESS_PAGE) == EXPECTED
+
+def test_parse_cached_unwritable(tmp_path, monkeypatch):
+    """A cache directory that can't be created still returns the parsed record"""
+    blocker = tmp_path / "parse_cache"
+    blocker.write_text("not a directory")
+    monkeypatch.setattr(windows_scraper, "PARSE_CACHE", True)
+    monkeypatch.setattr(windows_scraper, "PARSE_CACHE_DIR", str(blocker))
+    assert parse_cached(BUSINESS_PAGE) == EXPECTED
+
+def test_table_to_dict():
+    """Labels match exactly once the colon is dropped, and the first one wins"""
+    table = lxml_html.fragment_fromstring(
+        "<table>"
+        "<tr><td><strong>Business Name:</strong></td><td>ACME <span>INC</span></td></tr>"
+        "<tr><td>Business Name</td><td>SECOND</td><td>Physical Address:</td><td></td></tr>"
+        "<tr><td>Principal Business Name:</td><td>OTHER</td></tr>"
+        "</table>"
+    )
+    # Value cells are tried as labels too, so only the real pairs are checked
+    assert table_to_dict(table).items() >= {
+        "Business Name": "ACMEINC",
+        "Physical Address": "",
+        "Principal Business Name": "OTHER",
+    }.items()
+
+def test_slice_tables():
+    """The slice runs from the first body table to the last </table>"""
+    sliced = slice_tables(BUSINESS_PAGE)
+    assert sliced.startswith('<table id="MainContent_tblBusinessInfo"')
+    assert sliced.endswith("</table>")
+    assert "<script>" not in sliced
+    assert slice_tables("<html><body><p>No tables</p></body></html>") == "<html><body><p>No tables</p></body></html>"
+
+def test_read_officers():
+    """Rows with three or more cells give their first three; shorter rows are skipped"""
+    table = lxml_html.fragment_fromstring(
+        '<table><tr><td><table class="grid gridstyle">'
+        "<thead><tr><td>Name</td><td>Title</td><td>Address</td></tr></thead>"
+        "<tbody>"
+        "<tr><td>JANE DOE</td><td>CEO</td><td>1 MAIN ST</td><td>extra</td></tr>"
+        '<tr><td colspan="2">No officers</td></tr>'
+        "<tr><td>JOHN <b>ROE</b></td><td>CFO</td><td>2 MAIN ST</td></tr>"
+        "</tbody></table></td></tr></table>"
+    )
+    assert read_officers(table) == [
+        {"Officer Name": "JANE DOE", "Officer Title": "CEO", "Officer Business Address": "1 MAIN ST"},
+        {"Officer Name": "JOHNROE", "Officer Title": "CFO", "Officer Business Address": "2 MAIN ST"},
+    ]
@@ -1,229 +1,717 @@
 #!/usr/bin/env python3
 """
-Simple Georgia Business Scraper - Windows Optimized
-Uses exact same approach as working testng.py
+Georgia Business Scraper - Windows Optimized
+Scrapes control numbers in one browser session and parses the details page
+with georgia_parser, the parser entity_processor uses as well
 Optimized for Windows GitHub Actions runners (no virtual display needed)
+Pass --record (or set SCRAPER_RECORD=1) to capture the session with ffmpeg
 """
 
-import json
+import orjson
+import argparse
+import base64
+import bisect
 import sys
+import gzip
+import hashlib
 import os
+import re
+import subprocess
 import time
+import queue
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from seleniumbase import SB
-from bs4 import BeautifulSoup
-from datetime import datetime
+import mycdp
+from lxml import html as lxml_html
+from urllib.parse import urljoin
+import requests
+# One parser for both scrapers, so their records cannot drift apart
+from georgia_parser import (
+    AGENT_LABELS, BUSINESS_LABELS, SECTION_LABELS, find_section_tables, label_values,
+    read_officers, slice_tables, table_to_dict,
+)
 
-def screenshot(sb, name, step):
-    """Take screenshot for debugging"""
-    if os.getenv('GITHUB_ACTIONS'):
+# Step screenshots and HTML dumps cost seconds per run, so they are off unless
+# SCRAPER_DEBUG=1. Failure screenshots are still taken in GitHub Actions.
+DEBUG_CAPTURE = os.getenv("SCRAPER_DEBUG") == "1"
+
+# Headless skips the compositor, but the Cloudflare checkbox is clicked with a
+# real mouse, so it is opt-in for runs that already have clearance
+HEADLESS = os.getenv("SCRAPER_HEADLESS") == "1"
+
+# With SCRAPER_PARSE_CACHE=1 parsed records are kept under parse_cache/, keyed
+# by a hash of the HTML, so a retry that fetches an unchanged page skips the
+# parse. The key includes PARSER_VERSION; bump it whenever the extraction
+# logic changes so older records are not served.
+PARSE_CACHE = os.getenv("SCRAPER_PARSE_CACHE") == "1"
+PARSE_CACHE_DIR = "parse_cache"
+PARSER_VERSION = 1
+
+# Debug artifacts are written to disk on one background thread so the browser
+# thread only pays for the capture; flush_artifacts() waits for them
+artifact_pool = ThreadPoolExecutor(max_workers=1)
+artifact_futures = []
+
+def flush_artifacts():
+    """Block until every queued artifact has been written"""
+    while artifact_futures:
+        artifact_futures.pop(0).result()
+
+def setup_recording():
+    """Start an ffmpeg screen recording; returns (process, video_file)"""
+    try:
+        os.makedirs("recordings", exist_ok=True)
+        video_file = f"recordings/session_{time.strftime('%H%M%S')}.mp4"
+        
+        # Test if ffmpeg is available
+        try:
+            ffmpeg_test = subprocess.run(["ffmpeg", "-version"], capture_output=True, text=True, timeout=5)
+            print(f"[REC] ffmpeg available: {ffmpeg_test.returncode == 0}")
+            if ffmpeg_test.returncode != 0:
+                print(f"[REC] ffmpeg error: {ffmpeg_test.stderr[:100]}")
+        except Exception as e:
+            print(f"[REC] ffmpeg test failed: {e}")
+            return None, None
+        
+        # Windows grabs the desktop directly; elsewhere record the X display
+        if sys.platform == "win32":
+            grab = ["-f", "gdigrab", "-i", "desktop"]
+        else:
+            print(f"[REC] Display environment: {os.getenv('DISPLAY', 'Not set')}")
+            grab = ["-f", "x11grab", "-s", "1920x1080", "-i", ":99"]
+        cmd = ["ffmpeg", "-y", *grab, "-r", "1", "-vf", "scale=1280:720", "-preset", "ultrafast", "-crf", "35", "-t", "600", video_file]
+        print(f"[REC] Starting recording: {video_file}")
+        print(f"[REC] Command: {' '.join(cmd)}")
+        
+        # Start recording with error output visible
+        process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        
+        # Give it a moment and check if it's still running
+        time.sleep(2)
+        if process.poll() is None:
+            print(f"[REC] Recording process started successfully (PID: {process.pid})")
+            return process, video_file
+        else:
+            stdout, stderr = process.communicate()
+            print(f"[REC] Recording failed to start")
+            print(f"[REC] stdout: {stdout.decode()[:200]}")
+            print(f"[REC] stderr: {stderr.decode()[:200]}")
+            return None, None
+            
+    except Exception as e:
+        print(f"[REC] Recording setup exception: {e}")
+        return None, None
+
+def stop_recording(recording, video_file):
+    """Stop the ffmpeg recording and report what was written"""
+    print("[REC] Stopping recording...")
+    recording.terminate()
+    
+    # Wait a bit for ffmpeg to finish writing
+    time.sleep(3)
+    
+    # Check if video file was created
+    if video_file and os.path.exists(video_file):
+        file_size = os.path.getsize(video_file)
+        print(f"[REC] Recording saved: {video_file} ({file_size} bytes)")
+        if file_size == 0:
+            print("[WARN] Warning: Video file is empty")
+    else:
+        print(f"[REC] Recording file not found: {video_file}")
+
+def screenshot(sb, name, step, failure=False):
+    """Take screenshot for debugging (failure shots only, unless SCRAPER_DEBUG=1)"""
+    if DEBUG_CAPTURE or (failure and os.getenv('GITHUB_ACTIONS')):
         try:
             os.makedirs("screenshots", exist_ok=True)
-            timestamp = datetime.now().strftime("%H%M%S")
+            timestamp = time.strftime("%H%M%S")
             filename = f"screenshots/step_{step:02d}_{name}_{timestamp}.png"
-            sb.save_screenshot(filename)
-            print(f"📸 Screenshot: {filename}")
+            # One CDP call here; base64 decoding and the write happen off-thread
+            png_base64 = sb.cdp.loop.run_until_complete(sb.cdp.page.send(mycdp.page.capture_screenshot(format_="png")))
+            artifact_futures.append(artifact_pool.submit(write_screenshot, filename, png_base64))
         except Exception as e:
             print(f"📸 Screenshot failed: {e}")
 
-def main():
-    # Get control number from command line
-    if len(sys.argv) != 2:
-        print("Usage: python windows_scraper.py <control_number>")
-        sys.exit(1)
-    
-    control_number = sys.argv[1].strip()
-    request_id = os.getenv('REQUEST_ID', f'win-{control_number}-{int(datetime.now().timestamp())}')
-    
-    print("=" * 60)
-    print("[WIN] Georgia Business Scraper (Windows Optimized)")
-    print("=" * 60)
-    print(f"Control Number: {control_number}")
-    print(f"Request ID: {request_id}")
-    print(f"Timestamp: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-    print(f"Platform: Windows (no virtual display needed)")
-    print("=" * 60)
+def write_screenshot(filename, png_base64):
+    """Decode and save a captured screenshot (runs on artifact_pool)"""
+    try:
+        with open(filename, "wb") as f:
+            f.write(base64.b64decode(png_base64))
+        print(f"📸 Screenshot: {filename}")
+    except Exception as e:
+        print(f"📸 Screenshot failed: {e}")
 
-    step = 0
+def write_html_dump(path, html):
+    """Gzip a page's HTML to path (runs on artifact_pool)"""
+    try:
+        os.makedirs("html_dumps", exist_ok=True)
+        # Level 3 shrinks the dump ~8x for almost no CPU
+        with gzip.open(path, "wt", encoding="utf-8", compresslevel=3) as f:
+            f.write(html)
+        print(f"[SAVE] HTML saved for debugging: {path}")
+    except Exception as e:
+        print(f"[SAVE] HTML dump failed: {e}")
+
+# Elapsed seconds at which to (re)click the Cloudflare checkbox while waiting
+CF_CLICK_SCHEDULE = (0, 3, 8, 15, 23)
+
+# Resolves true as soon as the selector matches, or with the final check after
+# the given number of milliseconds; the waiting happens inside the page
+WAIT_FOR_SELECTOR_JS = """new Promise(resolve => {
+    const selector = %s;
+    if (document.querySelector(selector)) return resolve(true);
+    const observer = new MutationObserver(() => {
+        if (document.querySelector(selector)) { observer.disconnect(); resolve(true); }
+    });
+    observer.observe(document, {childList: true, subtree: true});
+    setTimeout(() => { observer.disconnect(); resolve(!!document.querySelector(selector)); }, %d);
+})"""
+
+def wait_for_selector(sb, selector, timeout_ms):
+    """Block in the browser until selector matches or timeout_ms passes
 
+    Returns True/False, or None if the page navigated away mid-wait.
+    """
     try:
-        # Use EXACT same configuration as working testng.py
-        with SB(uc=True, test=True, locale="en") as sb:
-            url = "https://ecorp.sos.ga.gov/BusinessSearch"
-            print(f"Opening: {url}")
-            sb.activate_cdp_mode(url)
-            step += 1
-            screenshot(sb, "initial_load", step)
-
-            # Open site and bypass Cloudflare - EXACT same logic as testng.py
-            print("Waiting for search input and handling Cloudflare...")
-            control_input = 'input[id="txtControlNo"]'
-            start_time = time.time()
-            while not sb.cdp.is_element_present(control_input):
-                if time.time() - start_time > 30:
-                    print("[TIMEOUT] Timeout after 30 seconds waiting for search input")
-                    screenshot(sb, "timeout_search_input", step)
-                    raise Exception("Timeout waiting for search input after Cloudflare bypass")
-                try:
-                    print("Clicking Cloudflare bypass...")
-                    sb.uc_gui_click_cf()
-                except:
-                    pass
-                time.sleep(1)  # Brief pause between attempts
+        result = sb.cdp.loop.run_until_complete(
+            sb.cdp.page.evaluate(WAIT_FOR_SELECTOR_JS % (orjson.dumps(selector).decode(), timeout_ms), await_promise=True)
+        )
+        return result is True
+    except Exception:
+        return None
 
-            elapsed = time.time() - start_time
-            print(f"[OK] Search input available after {elapsed:.1f} seconds, proceeding with search...")
-            step += 1
-            screenshot(sb, "cloudflare_bypassed", step)
-            sb.cdp.sleep(2)
-            sb.cdp.type(control_input, control_number)
-            sb.cdp.click('input[id="btnSearch"]')
-            step += 1
-            screenshot(sb, "search_submitted", step)
-            
-            print("Clicking business details link...")
-            sb.cdp.click("td > a")
-            step += 1
-            screenshot(sb, "business_link_clicked", step)
-            
-            print("Waiting for business details page and handling Cloudflare...")
-            start_time = time.time()
-            while not sb.cdp.is_element_present('table'):
-                if time.time() - start_time > 30:
-                    print("[TIMEOUT] Timeout after 30 seconds waiting for business details table")
-                    screenshot(sb, "timeout_business_details", step)
-                    raise Exception("Timeout waiting for business details table after Cloudflare bypass")
+# Resolves true once the element is enabled and the page has finished loading,
+# or false after the given number of milliseconds. setTimeout rather than
+# requestAnimationFrame, which stops firing while the window is occluded.
+WAIT_FOR_READY_JS = """new Promise(resolve => {
+    const selector = %s;
+    const deadline = performance.now() + %d;
+    const tick = () => {
+        const el = document.querySelector(selector);
+        if (el && !el.disabled && document.readyState === 'complete') return resolve(true);
+        if (performance.now() > deadline) return resolve(false);
+        setTimeout(tick, 20);
+    };
+    tick();
+})"""
+
+def wait_until_ready(sb, selector, timeout_ms):
+    """Block in the browser until selector is enabled and the page has loaded"""
+    try:
+        result = sb.cdp.loop.run_until_complete(
+            sb.cdp.page.evaluate(WAIT_FOR_READY_JS % (orjson.dumps(selector).decode(), timeout_ms), await_promise=True)
+        )
+        return result is True
+    except Exception:
+        return False
+
+# True while a Cloudflare challenge is on the page: the interstitial's title, or
+# the Turnstile widget's light-DOM parts (its iframe can sit in a closed shadow root)
+CF_CHALLENGE_JS = (
+    "document.title.includes('Just a moment')"
+    " || !!document.querySelector('iframe[src*=\"challenges.cloudflare.com\"], "
+    "input[name=\"cf-turnstile-response\"], .cf-turnstile')"
+)
+
+def cloudflare_challenge_present(sb):
+    """Check for a challenge before clicking; assume one if the page can't be read"""
+    try:
+        return sb.cdp.evaluate(CF_CHALLENGE_JS) is not False
+    except Exception:
+        return True
+
+def bypass_cloudflare_with_timeout(sb, selector, timeout=30):
+    """Wait for selector, clicking the Cloudflare checkbox on a schedule
+
+    Between clicks a MutationObserver waits in the page, so the selector is
+    noticed as soon as it appears with one CDP call per interval instead of
+    polling. Returns elapsed seconds, or None on timeout.
+    """
+    start_time = time.time()
+    clicks = list(CF_CLICK_SCHEDULE)
+    navigations = 0
+    # Resolved once; SeleniumBase proxies make each attribute chain non-trivial
+    click_cf = sb.uc_gui_click_cf
+    while True:
+        elapsed = time.time() - start_time
+        if elapsed > timeout:
+            return None
+        if clicks and elapsed >= clicks[0]:
+            while clicks and elapsed >= clicks[0]:
+                clicks.pop(0)
+            # Skip the GUI click while the challenge is still loading or absent
+            if cloudflare_challenge_present(sb):
                 try:
-                    print("Clicking Cloudflare bypass on details page...")
-                    sb.uc_gui_click_cf()
+                    print(f"Clicking Cloudflare bypass ({elapsed:.1f}s)...")
+                    click_cf()
                 except:
                     pass
-                time.sleep(1)  # Brief pause between attempts
-            
-            elapsed = time.time() - start_time
-            print(f"[OK] Business details loaded after {elapsed:.1f} seconds, extracting data...")
-            step += 1
-            screenshot(sb, "business_details_loaded", step)
-            html = sb.cdp.get_page_source()
-
-            # Save HTML for debugging in GitHub Actions
-            if os.getenv('GITHUB_ACTIONS'):
-                os.makedirs("html_dumps", exist_ok=True)
-                with open(f"html_dumps/business_details_{request_id}.html", "w", encoding="utf-8") as f:
-                    f.write(html)
-                print(f"[SAVE] HTML saved for debugging")
-
-            # Parse data using EXACT same logic as testng.py
-            soup = BeautifulSoup(html, "html.parser")
-            data = {}
-
-            # Helper to get value by label in a table
-            def get_value_by_label(table, label):
-                for row in table.find_all("tr"):
-                    tds = row.find_all("td")
-                    for i, td in enumerate(tds):
-                        if label in td.get_text(strip=True):
-                            # Value is in the next <td>
-                            if i + 1 < len(tds):
-                                return tds[i + 1].get_text(strip=True)
-                return None
-
-            # 1. Business Information
-            business_info = {}
-            biz_table = soup.find("td", string=lambda s: s and "Business Information" in s)
-            if biz_table:
-                biz_table = biz_table.find_parent("table")
-                business_info["Business Name"] = get_value_by_label(biz_table, "Business Name")
-                business_info["Control Number"] = get_value_by_label(biz_table, "Control Number")
-                business_info["Business Type"] = get_value_by_label(biz_table, "Business Type")
-                business_info["Business Status"] = get_value_by_label(biz_table, "Business Status")
-                business_info["Business Purpose"] = get_value_by_label(biz_table, "Business Purpose")
-                business_info["Principal Office Address"] = get_value_by_label(biz_table, "Principal Office Address")
-                business_info["Date of Formation / Registration Date"] = get_value_by_label(biz_table, "Date of Formation / Registration Date")
-                business_info["Jurisdiction"] = get_value_by_label(biz_table, "Jurisdiction")
-                business_info["Last Annual Registration Year"] = get_value_by_label(biz_table, "Last Annual Registration Year")
-                business_info["Dissolved Date"] = get_value_by_label(biz_table, "Dissolved Date")
-            data["Business Information"] = business_info
-
-            # 2. Registered Agent Information
-            agent_info = {}
-            agent_table = soup.find("td", string=lambda s: s and "Registered Agent Information" in s)
-            if agent_table:
-                agent_table = agent_table.find_parent("table")
-                agent_info["Registered Agent Name"] = get_value_by_label(agent_table, "Registered Agent Name")
-                agent_info["Physical Address"] = get_value_by_label(agent_table, "Physical Address")
-                agent_info["County"] = get_value_by_label(agent_table, "County")
-            data["Registered Agent Information"] = agent_info
-
-            # 3. Officer Information
-            officers = []
-            officer_table = soup.find("td", string=lambda s: s and "Officer Information" in s)
-            if officer_table:
-                officer_table = officer_table.find_parent("table")
-                grid = officer_table.find("table", class_="gridstyle")
-                if grid:
-                    tbody = grid.find("tbody")
-                    if tbody:
-                        for row in tbody.find_all("tr"):
-                            cols = row.find_all("td")
-                            if len(cols) == 3:
-                                officers.append({
-                                    "Officer Name": cols[0].get_text(strip=True),
-                                    "Officer Title": cols[1].get_text(strip=True),
-                                    "Officer Business Address": cols[2].get_text(strip=True)
-                                })
-            data["Officer Information"] = officers
-
-            # Save results for GitHub Actions
-            output_filename = f"processed_data_{request_id}.json"
-            with open(output_filename, "w", encoding="utf-8") as f:
-                json.dump({
-                    "success": True,
-                    "control_number": control_number,
-                    "request_id": request_id,
-                    "timestamp": datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-                    "extraction_method": "windows_optimized",
-                    "platform": "Windows GitHub Actions",
-                    "data": data
-                }, f, indent=2, ensure_ascii=False)
-
-            print("\n" + "=" * 60)
-            print("[SUCCESS] Data Extracted on Windows!")
-            print("=" * 60)
-            print("Extracted Business Data:")
-            print(json.dumps(data, indent=2, ensure_ascii=False))
-            print(f"\n[OK] Results saved to: {output_filename}")
-            
-            # Verify we got meaningful data
-            business_name = data.get("Business Information", {}).get("Business Name")
-            if business_name:
-                print(f"[OK] Successfully extracted data for: {business_name}")
-            else:
-                print("[WARN] Warning: No business name found in extracted data")
-                
+        # Wait until the next scheduled click, or the timeout
+        next_stop = min(clicks[0], timeout) if clicks else timeout
+        found = wait_for_selector(sb, selector, max(int((next_stop - elapsed) * 1000), 100))
+        if found:
+            return time.time() - start_time
+        if found is None:
+            # The challenge page navigated mid-wait. Retry almost at once, since
+            # the next wait probes the new page immediately, backing off to 1s
+            # if it keeps navigating.
+            time.sleep(min(0.05 * 2 ** navigations, 1.0))
+            navigations += 1
+
+# Fills an input and fires the events its form listens for, in one CDP call
+# instead of a key event per character; true if the value stuck
+SET_INPUT_JS = """(() => {
+    const el = document.querySelector(%s);
+    if (!el) return false;
+    el.value = %s;
+    el.dispatchEvent(new Event('input', {bubbles: true}));
+    el.dispatchEvent(new Event('change', {bubbles: true}));
+    return el.value === %s;
+})()"""
+
+def set_input_value(sb, selector, value):
+    """Set an input's value directly, typing it only if that is rejected"""
+    literal = orjson.dumps(value).decode()
+    try:
+        if sb.cdp.evaluate(SET_INPUT_JS % (orjson.dumps(selector).decode(), literal, literal)) is True:
+            return
     except Exception as e:
-        print(f"\n[ERROR] Error occurred: {str(e)}")
-        
-        # Create error result file
-        error_data = {
-            "success": False,
-            "error": str(e),
+        print(f"Setting input value failed, typing instead: {e}")
+    sb.cdp.type(selector, value)
+
+# Images, fonts and media the scraper never reads. CSS stays so the Cloudflare
+# widget still lays out where uc_gui_click_cf expects it.
+BLOCKED_URLS = ["*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.ico", "*.woff", "*.woff2", "*.ttf", "*.otf", "*.mp4", "*.webm"]
+
+def block_static_assets(sb):
+    """Stop the browser downloading BLOCKED_URLS for the rest of the session"""
+    try:
+        sb.cdp.loop.run_until_complete(sb.cdp.page.send(mycdp.network.enable()))
+        sb.cdp.loop.run_until_complete(sb.cdp.page.send(mycdp.network.set_blocked_urls(urls=BLOCKED_URLS)))
+    except Exception as e:
+        print(f"Asset blocking unavailable, loading everything: {e}")
+
+# Outer HTML of the top-level tables that hold a section title (every field
+# lives inside one), or of all top-level tables if none match
+TABLES_HTML_JS = """(() => {
+    const tables = Array.from(document.querySelectorAll('table'))
+        .filter(t => !t.parentElement || !t.parentElement.closest('table'));
+    const sections = tables.filter(t => /(Business|Registered Agent|Officer) Information/.test(t.textContent));
+    return (sections.length ? sections : tables).map(t => t.outerHTML).join('\\n');
+})()"""
+
+def get_tables_html(sb):
+    """Serialize just the page's tables, falling back to the full page source"""
+    try:
+        html = sb.cdp.evaluate(TABLES_HTML_JS)
+        if html:
+            return html
+    except Exception as e:
+        print(f"Table extraction failed, using full page source: {e}")
+    return sb.cdp.get_page_source()
+
+def fetch_details_html(sb, url, referer):
+    """GET the details page over HTTP with the browser's Cloudflare-cleared cookies
+
+    Returns the HTML, or None if Cloudflare refuses the replayed session.
+    """
+    try:
+        cookies = {cookie.name: cookie.value for cookie in sb.cdp.get_all_cookies()}
+        headers = {"User-Agent": sb.cdp.get_user_agent(), "Referer": referer}
+        response = requests.get(url, cookies=cookies, headers=headers, timeout=15)
+        if response.status_code != 200 or "just a moment" in response.text[:2000].lower():
+            print(f"HTTP fetch refused (status {response.status_code}), using the browser")
+            return None
+        return response.text
+    except Exception as e:
+        print(f"HTTP fetch failed, using the browser: {e}")
+        return None
+
+# A section title opening a <td>, possibly inside <b> or <span>, and every
+# table tag, for slicing raw HTML. Titles in <th> tab rows or captions are
+# not section headers and must not match.
+SECTION_TITLE_PATTERN = re.compile(
+    r"<td\b[^>]*>\s*(?:<(?!/?t[dhr]\b)[^>]+>\s*)*(" + "|".join(map(re.escape, SECTION_LABELS)) + r")\s*<"
+)
+TABLE_TAG_PATTERN = re.compile(r"<(/?)table\b", re.IGNORECASE)
+
+def slice_section_tables(html):
+    """Cut out just the innermost table enclosing each section title
+
+    One regex scan finds the titles and the table tags; the tags are then
+    balanced around each title. Returns None unless all three were found, so
+    the caller can fall back to slice_tables.
+    """
+    body = max(html.find("<body"), 0)
+    titles = {}
+    for match in SECTION_TITLE_PATTERN.finditer(html, body):
+        titles.setdefault(match.group(1), match.start())
+    if len(titles) < len(SECTION_LABELS):
+        return None
+    tags = [(match.start(), match.group(1) == "/") for match in TABLE_TAG_PATTERN.finditer(html, body)]
+    tag_starts = [tag_start for tag_start, _ in tags]
+    spans = []
+    for position in titles.values():
+        # Walk back from the title to the <table still open there...
+        index, depth = bisect.bisect_left(tag_starts, position) - 1, 0
+        while index >= 0:
+            if tags[index][1]:
+                depth += 1
+            elif depth:
+                depth -= 1
+            else:
+                break
+            index -= 1
+        if index < 0:
+            return None
+        # ...then forward to its matching </table>
+        start, depth = tags[index][0], 0
+        for tag_start, closing in tags[index + 1:]:
+            if not closing:
+                depth += 1
+            elif depth:
+                depth -= 1
+            else:
+                end = html.find(">", tag_start) + 1
+                break
+        else:
+            return None
+        spans.append((start, end))
+    # Drop spans nested in another one (e.g. sections sharing a table)
+    spans.sort(key=lambda span: (span[0], -span[1]))
+    fragments, last_end = [], -1
+    for start, end in spans:
+        if start >= last_end:
+            fragments.append(html[start:end])
+            last_end = end
+    return "\n".join(fragments)
+
+def parse_business_html(html):
+    """Parse the business details page into its three sections
+
+    The section lookup and the field and officer rules are georgia_parser's,
+    so this returns the same record as entity_processor for the same page.
+    """
+    # lxml keeps the tree in C and only wraps the nodes we touch. The sliced
+    # sections are only trusted if all three titles are found in them again.
+    sections = {}
+    section_html = slice_section_tables(html)
+    if section_html is not None:
+        sections = find_section_tables(lxml_html.document_fromstring(section_html))
+    if len(sections) < len(SECTION_LABELS):
+        sections = find_section_tables(lxml_html.document_fromstring(slice_tables(html)))
+    data = {}
+
+    # 1. Business Information and 2. Registered Agent Information
+    for title, labels in (("Business Information", BUSINESS_LABELS), ("Registered Agent Information", AGENT_LABELS)):
+        table = sections.get(title)
+        data[title] = {} if table is None else label_values(table_to_dict(table), labels)
+
+    # 3. Officer Information
+    officer_table = sections.get("Officer Information")
+    data["Officer Information"] = [] if officer_table is None else read_officers(officer_table)
+    return data
+
+def parse_cached(html):
+    """parse_business_html, reusing the stored record for HTML seen before"""
+    if not PARSE_CACHE:
+        return parse_business_html(html)
+    fingerprint = hashlib.blake2b(html.encode("utf-8"), digest_size=16).hexdigest()
+    cache_path = os.path.join(PARSE_CACHE_DIR, f"v{PARSER_VERSION}-{fingerprint}.json")
+    try:
+        with open(cache_path, "rb") as f:
+            print(f"[CACHE] Reusing parsed record {fingerprint}")
+            return orjson.loads(f.read())
+    except (OSError, orjson.JSONDecodeError):
+        pass
+    data = parse_business_html(html)
+    # The page parsed fine; a cache that can't be written must not fail it
+    try:
+        os.makedirs(PARSE_CACHE_DIR, exist_ok=True)
+        with open(cache_path, "wb") as f:
+            f.write(orjson.dumps(data))
+    except OSError as e:
+        print(f"[CACHE] Could not store parsed record {fingerprint}: {e}")
+    return data
+
+def save_result(control_number, request_id, data, verbose=False):
+    """Save a successful scrape for GitHub Actions"""
+    output_filename = f"processed_data_{request_id}.json"
+    with open(output_filename, "wb") as f:
+        f.write(orjson.dumps({
+            "success": True,
             "control_number": control_number,
             "request_id": request_id,
-            "timestamp": datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            "timestamp": time.strftime('%Y-%m-%d %H:%M:%S'),
             "extraction_method": "windows_optimized",
-            "platform": "Windows GitHub Actions"
-        }
-        
-        output_filename = f"processed_data_{request_id}.json"
-        with open(output_filename, 'w', encoding='utf-8') as f:
-            json.dump(error_data, f, indent=2, ensure_ascii=False)
-        
-        print(f"[ERROR] Error details saved to: {output_filename}")
+            "platform": "Windows GitHub Actions",
+            "data": data
+        }, option=orjson.OPT_INDENT_2))
+
+    print("\n" + "=" * 60)
+    print(f"[SUCCESS] Data Extracted on Windows! ({control_number})")
+    print("=" * 60)
+    if verbose:
+        print("Extracted Business Data:")
+        # Hand orjson's bytes straight to stdout instead of decoding to str
+        sys.stdout.flush()
+        sys.stdout.buffer.write(orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_APPEND_NEWLINE))
+        sys.stdout.buffer.flush()
+    print(f"\n[OK] Results saved to: {output_filename}")
+    
+    # Verify we got meaningful data
+    business_name = data.get("Business Information", {}).get("Business Name")
+    if business_name:
+        print(f"[OK] Extracted {len(data['Officer Information'])} officers for: {business_name}")
+    else:
+        print("[WARN] Warning: No business name found in extracted data")
+
+def save_error(control_number, request_id, error):
+    """Save an error result file for a control number that failed"""
+    print(f"\n[ERROR] Error occurred ({control_number}): {str(error)}")
+    
+    # Create error result file
+    error_data = {
+        "success": False,
+        "error": str(error),
+        "control_number": control_number,
+        "request_id": request_id,
+        "timestamp": time.strftime('%Y-%m-%d %H:%M:%S'),
+        "extraction_method": "windows_optimized",
+        "platform": "Windows GitHub Actions"
+    }
+    
+    output_filename = f"processed_data_{request_id}.json"
+    with open(output_filename, 'wb') as f:
+        f.write(orjson.dumps(error_data, option=orjson.OPT_INDENT_2))
+    
+    print(f"[ERROR] Error details saved to: {output_filename}")
+
+def parse_and_save(pending, failures, verbose=False):
+    """Consumer thread: parse and save each page the browser thread queues
+
+    Runs until it receives None. lxml releases the GIL while parsing, so this
+    overlaps with the browser waiting on the next control number's pages.
+    """
+    while True:
+        item = pending.get()
+        if item is None:
+            return
+        control_number, request_id, html = item
+        try:
+            save_result(control_number, request_id, parse_cached(html), verbose)
+        except Exception as e:
+            failures.append(control_number)
+            save_error(control_number, request_id, e)
+
+SEARCH_URL = "https://ecorp.sos.ga.gov/BusinessSearch"
+
+def activate_search_page(sb):
+    """Switch the session to CDP mode, which opens the search page itself"""
+    print(f"Opening: {SEARCH_URL}")
+    sb.activate_cdp_mode(SEARCH_URL)
+    block_static_assets(sb)
+
+def scrape_business_html(sb, control_number, request_id, first):
+    """Search for one control number and return its business details HTML
+
+    first means activate_search_page() has just opened the search page, so it
+    is not loaded again.
+    """
+    url = SEARCH_URL
+    step = 0
+    if not first:
+        print(f"Opening: {url}")
+        sb.cdp.get(url)
+    step += 1
+    screenshot(sb, "initial_load", step)
+
+    control_input = 'input[id="txtControlNo"]'
+    elapsed = None
+    if not first:
+        # The first search's cf_clearance cookie carries over, so later pages
+        # normally load without a challenge; only click if one shows up anyway
+        start_time = time.time()
+        if wait_for_selector(sb, control_input, 10000):
+            elapsed = time.time() - start_time
+    if elapsed is None:
+        # Wait for the search input, clicking the Cloudflare checkbox on a schedule
+        print("Waiting for search input and handling Cloudflare...")
+        elapsed = bypass_cloudflare_with_timeout(sb, control_input, timeout=30)
+    if elapsed is None:
+        print("[TIMEOUT] Timeout after 30 seconds waiting for search input")
+        screenshot(sb, "timeout_search_input", step, failure=True)
+        raise Exception("Timeout waiting for search input after Cloudflare bypass")
+
+    print(f"[OK] Search input available after {elapsed:.1f} seconds, proceeding with search...")
+    step += 1
+    screenshot(sb, "cloudflare_bypassed", step)
+    # Capped at the 2 seconds this used to sleep unconditionally
+    wait_until_ready(sb, control_input, 2000)
+    set_input_value(sb, control_input, control_number)
+    sb.cdp.click('input[id="btnSearch"]')
+    step += 1
+    screenshot(sb, "search_submitted", step)
+    
+    # Replay the cleared session over plain HTTP first; only open the
+    # details page in the browser if Cloudflare refuses it
+    details_url = urljoin(url, sb.cdp.get_element_attribute("td > a", "href"))
+    print(f"Fetching business details: {details_url}")
+    html = fetch_details_html(sb, details_url, url)
+    if html is None:
+        print("Clicking business details link...")
+        sb.cdp.click("td > a")
+        step += 1
+        screenshot(sb, "business_link_clicked", step)
+    
+        print("Waiting for business details page and handling Cloudflare...")
+        elapsed = bypass_cloudflare_with_timeout(sb, 'table', timeout=30)
+        if elapsed is None:
+            print("[TIMEOUT] Timeout after 30 seconds waiting for business details table")
+            screenshot(sb, "timeout_business_details", step, failure=True)
+            raise Exception("Timeout waiting for business details table after Cloudflare bypass")
+    
+        print(f"[OK] Business details loaded after {elapsed:.1f} seconds, extracting data...")
+        step += 1
+        screenshot(sb, "business_details_loaded", step)
+        html = get_tables_html(sb)
+
+    # Save HTML for debugging, compressed and written off the critical path
+    if DEBUG_CAPTURE:
+        artifact_futures.append(artifact_pool.submit(write_html_dump, f"html_dumps/business_details_{request_id}.html.gz", html))
+    return html
+
+def parse_args():
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description="Scrape Georgia business entities by control number")
+    parser.add_argument("control_numbers", nargs="*", help="Control numbers to look up")
+    parser.add_argument("--batch", metavar="FILE", help="Read control numbers from FILE, one per line")
+    parser.add_argument("--record", action="store_true", default=os.getenv("SCRAPER_RECORD") == "1",
+                        help="Record the browser session with ffmpeg (or set SCRAPER_RECORD=1)")
+    parser.add_argument("--verbose", action="store_true", help="Print each extracted record as well as saving it")
+    parser.add_argument("--parallel", type=int, default=1, metavar="N",
+                        help="Split the control numbers across N browser processes")
+    args = parser.parse_args()
+    if not args.control_numbers and not args.batch and sys.stdin.isatty():
+        parser.error("no control numbers given (pass them as arguments, with --batch FILE or on stdin)")
+    return args
+
+def read_control_numbers(args):
+    """Control numbers from the command line and --batch file, or one per line on stdin if none are given"""
+    control_numbers = [arg.strip() for arg in args.control_numbers if arg.strip()]
+    if args.batch:
+        with open(args.batch, encoding='utf-8') as f:
+            control_numbers.extend(line.strip() for line in f if line.strip())
+    if not control_numbers and not sys.stdin.isatty():
+        control_numbers = [line.strip() for line in sys.stdin if line.strip()]
+    return list(dict.fromkeys(control_numbers))
+
+def scrape_batch(control_numbers, request_ids, headless=False, verbose=False):
+    """Scrape control numbers in one browser session, returns those that failed
+
+    Used directly for a single browser and as the process pool task otherwise.
+    The browser stays on this thread; parsing and saving happen on a second
+    one, so page N is parsed while page N+1 is loading.
+    """
+    pending = queue.Queue()
+    failures = []
+    handed_off = set()
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        consumer = executor.submit(parse_and_save, pending, failures, verbose)
+        try:
+            # No test=True: its test-run hooks add overhead to every action
+            with SB(uc=True, locale="en", headless=headless) as sb:
+                # Set once CDP mode is on; until then every number tries to
+                # activate it, since sb.cdp does not work without it
+                activated = False
+                for control_number in control_numbers:
+                    request_id = request_ids[control_number]
+                    try:
+                        first = not activated
+                        if first:
+                            activate_search_page(sb)
+                            activated = True
+                        html = scrape_business_html(sb, control_number, request_id, first)
+                    except Exception as e:
+                        failures.append(control_number)
+                        save_error(control_number, request_id, e)
+                    else:
+                        pending.put((control_number, request_id, html))
+                    handed_off.add(control_number)
+        except Exception as e:
+            # The browser itself failed; nothing after this point was scraped
+            for control_number in control_numbers:
+                if control_number not in handed_off:
+                    failures.append(control_number)
+                    save_error(control_number, request_ids[control_number], e)
+        finally:
+            pending.put(None)
+            consumer.result()
+            # Pool workers exit without joining artifact_pool
+            flush_artifacts()
+    return failures
+
+def main():
+    # Get control numbers from the command line, a batch file or stdin;
+    # they share one browser session unless --parallel splits them
+    args = parse_args()
+    control_numbers = read_control_numbers(args)
+    if not control_numbers:
+        print("No control numbers to scrape")
         sys.exit(1)
+    # One clock read serves the request IDs and the banner
+    run_start = time.time()
+    env_request_id = os.getenv('REQUEST_ID')
+    request_ids = {}
+    for control_number in control_numbers:
+        if env_request_id:
+            # A batch shares the requested ID, suffixed so each file is distinct
+            request_ids[control_number] = env_request_id if len(control_numbers) == 1 else f"{env_request_id}-{control_number}"
+        else:
+            request_ids[control_number] = f'win-{control_number}-{int(run_start)}'
     
+    print("=" * 60)
+    print("[WIN] Georgia Business Scraper (Windows Optimized)")
+    print("=" * 60)
+    for control_number in control_numbers:
+        print(f"Control Number: {control_number} (Request ID: {request_ids[control_number]})")
+    print(f"Timestamp: {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(run_start))}")
+    print(f"Platform: Windows (no virtual display needed)")
+    print("=" * 60)
+
+    # Recording is opt-in so the default run stays on the fast path
+    recording, video_file = setup_recording() if args.record else (None, None)
+
+    # A recording needs a visible window, so it overrides headless
+    headless = HEADLESS and not args.record
+    workers = max(1, min(args.parallel, len(control_numbers)))
+    failures = []
+    try:
+        if workers == 1:
+            failures = scrape_batch(control_numbers, request_ids, headless, args.verbose)
+        else:
+            # Selenium is not thread-safe, so each worker is a process with its
+            # own browser working through an interleaved slice of the batch
+            print(f"Scraping with {workers} browser processes")
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                futures = {
+                    pool.submit(scrape_batch, control_numbers[i::workers], request_ids, headless, args.verbose): control_numbers[i::workers]
+                    for i in range(workers)
+                }
+                for future in as_completed(futures):
+                    try:
+                        failures.extend(future.result())
+                    except Exception as e:
+                        print(f"[ERROR] Browser worker failed for {', '.join(futures[future])}: {str(e)}")
+                        failures.extend(futures[future])
     finally:
-        # Windows scraper cleanup (no recording to stop)
+        # Stop recording if it was started
+        if recording:
+            stop_recording(recording, video_file)
         print("[WIN] Windows scraper completed")
 
+    if failures:
+        sys.exit(1)
+
 if __name__ == "__main__":
-    main() 
+    main()